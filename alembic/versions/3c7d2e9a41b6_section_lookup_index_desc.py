@@ -0,0 +1,44 @@
+"""section_lookup_index_desc
+
+Revision ID: 3c7d2e9a41b6
+Revises: fc577ba2e566
+Create Date: 2026-10-15 10:12:41.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7d2e9a41b6'
+down_revision: Union[str, None] = 'fc577ba2e566'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Step 1: Add index matching the voter -> section LATERAL lookup
+    # (WHERE document_id = ? AND start_serial_number <= ?
+    #  ORDER BY start_serial_number DESC, section_id DESC LIMIT 1)
+    op.create_index(
+        'ix_document_sections_doc_start_desc',
+        'document_sections',
+        ['document_id', sa.text('start_serial_number DESC'), sa.text('section_id DESC')]
+    )
+    
+    # Step 2: Drop the old (document_id, start_serial_number) index, which the new one covers
+    op.drop_index('ix_document_sections_doc_start_serial', table_name='document_sections')
+
+
+def downgrade() -> None:
+    # Step 1: Restore the old index
+    op.create_index(
+        'ix_document_sections_doc_start_serial',
+        'document_sections',
+        ['document_id', 'start_serial_number']
+    )
+    
+    # Step 2: Drop the descending lookup index
+    op.drop_index('ix_document_sections_doc_start_desc', table_name='document_sections')
@@ -0,0 +1,49 @@
+"""voter_search_trigram_indexes
+
+Revision ID: 8e41b0c5d2f7
+Revises: 3c7d2e9a41b6
+Create Date: 2026-10-15 11:03:27.904415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e41b0c5d2f7'
+down_revision: Union[str, None] = '3c7d2e9a41b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, indexed expression) for every column the voter search ILIKEs
+TRIGRAM_INDEXES = [
+    ('ix_voters_voter_name_english_trgm', 'voter_name_english'),
+    ('ix_voters_voter_name_local_trgm', 'voter_name_local'),
+    ('ix_voters_relation_name_english_trgm', 'relation_name_english'),
+    ('ix_voters_relation_name_local_trgm', 'relation_name_local'),
+    ('ix_voters_house_number_trgm', 'house_number'),
+    ('ix_voters_photo_id_trgm', 'photo_id'),
+    # Must match CAST(voters.serial_number AS VARCHAR) emitted by the default search
+    ('ix_voters_serial_number_trgm', '(CAST(serial_number AS VARCHAR))'),
+]
+
+
+def upgrade() -> None:
+    # Step 1: Enable trigram support
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    
+    # Step 2: Add trigram GIN indexes so ILIKE '%term%' searches can use an index
+    # instead of scanning every voter
+    for index_name, expression in TRIGRAM_INDEXES:
+        op.execute(
+            f"CREATE INDEX {index_name} ON voters USING gin ({expression} gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    # Step 1: Drop the trigram indexes (the extension is left installed)
+    for index_name, _ in TRIGRAM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
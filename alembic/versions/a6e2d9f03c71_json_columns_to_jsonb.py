@@ -0,0 +1,55 @@
+"""json_columns_to_jsonb
+
+Revision ID: a6e2d9f03c71
+Revises: f41c8b6d0e27
+Create Date: 2026-10-15 14:02:37.915408
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6e2d9f03c71'
+down_revision: Union[str, None] = 'f41c8b6d0e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column) pairs stored as json until this revision
+JSON_COLUMNS = [
+    ('extraction_segments', 'raw_response_json'),
+    ('extraction_segments', 'parsed_header_json'),
+    ('extraction_segments', 'parsed_list_json'),
+    ('document_header', 'raw_header_json'),
+    ('voters', 'raw_row_json'),
+]
+
+
+def upgrade() -> None:
+    # Store extraction payloads as jsonb (parsed once on write, not on every read).
+    # No GIN indexes: nothing filters on these columns yet.
+    for table, column in JSON_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            existing_nullable=True,
+            postgresql_using=f'{column}::jsonb',
+        )
+
+
+def downgrade() -> None:
+    for table, column in JSON_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            existing_nullable=True,
+            postgresql_using=f'{column}::json',
+        )
@@ -0,0 +1,33 @@
+"""document_header_state_ac_index
+
+Revision ID: b52f6a1e8c03
+Revises: 8e41b0c5d2f7
+Create Date: 2026-10-15 11:40:52.117630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52f6a1e8c03'
+down_revision: Union[str, None] = '8e41b0c5d2f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add index matching the voter list filter
+    # (lower(state) = ? AND assembly_constituency_number_english = ?)
+    # Voters are already indexed on (document_id, serial_number) by uq_voter_doc_serial
+    op.create_index(
+        'ix_document_header_state_ac',
+        'document_header',
+        [sa.text('lower(state)'), 'assembly_constituency_number_english']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_header_state_ac', table_name='document_header')
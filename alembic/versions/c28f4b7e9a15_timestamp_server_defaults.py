@@ -0,0 +1,55 @@
+"""timestamp_server_defaults
+
+Revision ID: c28f4b7e9a15
+Revises: a6e2d9f03c71
+Create Date: 2026-10-15 23:12:08.104722
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c28f4b7e9a15'
+down_revision: Union[str, None] = 'a6e2d9f03c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tables using TimestampMixin (created_at / updated_at)
+TIMESTAMP_TABLES = [
+    'documents',
+    'extraction_runs',
+    'extraction_segments',
+    'document_header',
+    'voters',
+    'document_sections',
+    'api_key_settings',
+]
+
+
+def upgrade() -> None:
+    # Timestamps are now generated by the database rather than sent by the application
+    for table in TIMESTAMP_TABLES:
+        for column in ('created_at', 'updated_at'):
+            op.alter_column(
+                table,
+                column,
+                server_default=sa.text('now()'),
+                existing_type=sa.DateTime(timezone=True),
+                existing_nullable=False,
+            )
+
+
+def downgrade() -> None:
+    for table in TIMESTAMP_TABLES:
+        for column in ('created_at', 'updated_at'):
+            op.alter_column(
+                table,
+                column,
+                server_default=None,
+                existing_type=sa.DateTime(timezone=True),
+                existing_nullable=False,
+            )
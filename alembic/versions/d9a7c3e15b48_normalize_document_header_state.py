@@ -0,0 +1,34 @@
+"""normalize_document_header_state
+
+Revision ID: d9a7c3e15b48
+Revises: b52f6a1e8c03
+Create Date: 2026-10-15 12:26:09.331847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a7c3e15b48'
+down_revision: Union[str, None] = 'b52f6a1e8c03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Trim and collapse whitespace in existing state values to match
+    # DocumentHeader.normalize_state, which now runs on every write
+    op.execute(r"""
+        UPDATE document_header
+        SET state = btrim(regexp_replace(state, '\s+', ' ', 'g'))
+        WHERE state IS NOT NULL
+          AND state <> btrim(regexp_replace(state, '\s+', ' ', 'g'))
+    """)
+
+
+def downgrade() -> None:
+    # Data normalization only; original whitespace can't be restored
+    pass
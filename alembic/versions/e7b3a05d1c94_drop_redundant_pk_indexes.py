@@ -0,0 +1,39 @@
+"""drop_redundant_pk_indexes
+
+Revision ID: e7b3a05d1c94
+Revises: c28f4b7e9a15
+Create Date: 2026-10-15 23:41:52.630218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3a05d1c94'
+down_revision: Union[str, None] = 'c28f4b7e9a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tables whose id column had an index alongside its primary key index
+PK_INDEXED_TABLES = [
+    'documents',
+    'extraction_runs',
+    'extraction_segments',
+    'voters',
+    'document_sections',
+    'api_key_settings',
+]
+
+
+def upgrade() -> None:
+    # The primary key constraint already provides a unique index on id
+    for table in PK_INDEXED_TABLES:
+        op.drop_index(op.f(f'ix_{table}_id'), table_name=table)
+
+
+def downgrade() -> None:
+    for table in PK_INDEXED_TABLES:
+        op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
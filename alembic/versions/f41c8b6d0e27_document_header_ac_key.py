@@ -0,0 +1,55 @@
+"""document_header_ac_key
+
+Revision ID: f41c8b6d0e27
+Revises: d9a7c3e15b48
+Create Date: 2026-10-15 13:18:44.602915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f41c8b6d0e27'
+down_revision: Union[str, None] = 'd9a7c3e15b48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Step 1: Add a stored generated column holding the constituency number as an integer:
+    # the english number when present, else the local value if it is plain (ASCII) digits
+    op.add_column(
+        'document_header',
+        sa.Column(
+            'ac_key',
+            sa.Integer(),
+            sa.Computed(
+                r"COALESCE(assembly_constituency_number_english, "
+                r"substring(assembly_constituency_number_local from '^\s*0*([0-9]{1,9})\s*$')::integer)",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    
+    # Step 2: Index the voter list filter (lower(state) = ? AND ac_key = ?),
+    # replacing the index on the english number that the filter no longer uses
+    op.create_index(
+        'ix_document_header_state_ac_key',
+        'document_header',
+        [sa.text('lower(state)'), 'ac_key']
+    )
+    op.drop_index('ix_document_header_state_ac', table_name='document_header')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_document_header_state_ac',
+        'document_header',
+        [sa.text('lower(state)'), 'assembly_constituency_number_english']
+    )
+    op.drop_index('ix_document_header_state_ac_key', table_name='document_header')
+    op.drop_column('document_header', 'ac_key')
@@ -2,12 +2,13 @@
 
 from typing import Optional
 
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 
 from app.core.voter_service import VoterService
-from app.db import get_db
+from app.db import AsyncSessionLocal, get_async_db
 from app.schemas.voters import VoterListResponse
 
 
@@ -15,7 +16,7 @@ class VoterController:
     """Controller for voter operations."""
     
     @staticmethod
-    def list_voters(
+    async def list_voters(
         state: str,
         assembly_constituency_number: str,
         # Search parameters
@@ -31,26 +32,38 @@ class VoterController:
         # Pagination
         page: int = 1,
         page_size: int = 50,
-        db: Session = Depends(get_db),
-    ) -> VoterListResponse:
-        """List voters with filtering and pagination."""
+        cursor: Optional[str] = None,
+        db: AsyncSession = Depends(get_async_db),
+    ) -> Response:
+        """
+        List voters with filtering and pagination.
+        
+        The page is serialized in one pass by pydantic-core and returned as a ready
+        Response, so FastAPI doesn't dump and re-validate it against response_model
+        (which the route still declares for the OpenAPI schema).
+        """
         service = VoterService(db)
-        return service.list_voters(
-            state=state,
-            assembly_constituency_number=assembly_constituency_number,
-            search=search,
-            search_type=search_type,
-            part_number=part_number,
-            polling_station=polling_station,
-            gender=gender,
-            sort_by=sort_by,
-            sort_order=sort_order,
-            page=page,
-            page_size=page_size,
-        )
+        try:
+            result: VoterListResponse = await service.list_voters(
+                state=state,
+                assembly_constituency_number=assembly_constituency_number,
+                search=search,
+                search_type=search_type,
+                part_number=part_number,
+                polling_station=polling_station,
+                gender=gender,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                page=page,
+                page_size=page_size,
+                cursor=cursor,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return Response(content=result.model_dump_json(), media_type="application/json")
     
     @staticmethod
-    def export_voters(
+    async def export_voters(
         state: str,
         assembly_constituency_number: str,
         # Search parameters
@@ -63,13 +76,15 @@ class VoterController:
         # Sort parameters
         sort_by: Optional[str] = None,
         sort_order: str = "asc",
-        db: Session = Depends(get_db),
     ) -> StreamingResponse:
         """Export voters to CSV format."""
+        # FastAPI closes yield dependencies before a streaming body is sent, so the
+        # export owns its session and closes it once the response has been sent
+        db = AsyncSessionLocal()
         service = VoterService(db)
         
         try:
-            csv_bytes, filename = service.export_voters_csv(
+            csv_chunks, filename = await service.export_voters_csv(
                 state=state,
                 assembly_constituency_number=assembly_constituency_number,
                 search=search,
@@ -80,11 +95,16 @@ class VoterController:
                 sort_by=sort_by,
                 sort_order=sort_order,
             )
-            
-            return StreamingResponse(
-                csv_bytes,
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
+        except ValueError as e:
+            await db.close()
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
+            await db.close()
             raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+        
+        return StreamingResponse(
+            csv_chunks,
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+            background=BackgroundTask(db.close),
+        )
@@ -6,18 +6,37 @@ from datetime import datetime
 from typing import List, Optional
 
 from pypdf import PdfReader
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select, true
+from sqlalchemy.orm import Session, aliased, joinedload
 
 from app.config import get_settings
-from app.models.core import Document, DocumentHeader, DocumentSection, ExtractionRun, ExtractionRunStatus, Voter
-from app.schemas.documents import DocumentDetail, DocumentListResponse, DocumentRead, DocumentSectionRead
+from app.models.core import Document, DocumentHeader, ExtractionRun, ExtractionRunStatus, Voter
+from app.schemas.documents import DocumentDetail, DocumentListResponse, DocumentRead
 from app.services.gemini_client import upload_file
 from app.core.extraction_service import ExtractionService
+from app.core.sections import get_sorted_sections
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Per-document aggregates projected alongside each Document row, so a document (or a page
+# of documents) is loaded in one query rather than two extra queries per document
+_voter_count = (
+    select(func.count(Voter.id))
+    .where(Voter.document_id == Document.id)
+    .correlate(Document)
+    .scalar_subquery()
+    .label("voter_count")
+)
+_latest_run = aliased(
+    ExtractionRun,
+    select(ExtractionRun)
+    .where(ExtractionRun.document_id == Document.id)
+    .order_by(ExtractionRun.created_at.desc())
+    .limit(1)
+    .lateral("latest_run"),
+)
+
 
 class DocumentService:
     """Service for document operations."""
@@ -66,20 +85,20 @@ class DocumentService:
     
     def get_document_detail(self, document_id: int) -> Optional[DocumentDetail]:
         """Get detailed document information."""
-        document = self.db.get(Document, document_id)
-        if not document:
+        # Document, header, voter count and latest run in one round trip
+        row = (
+            self.db.query(Document, _voter_count, _latest_run.status, _latest_run.error_message)
+            .options(joinedload(Document.header))
+            .outerjoin(_latest_run, true())
+            .filter(Document.id == document_id)
+            .first()
+        )
+        if not row:
             return None
         
+        document, voter_count, latest_run_status, latest_run_error_message = row
         header = document.header
-        voter_count = self.db.query(Voter).filter(Voter.document_id == document.id).count()
-        
-        # Get latest extraction run information
-        latest_run = self.db.query(ExtractionRun).filter(
-            ExtractionRun.document_id == document.id
-        ).order_by(ExtractionRun.created_at.desc()).first()
-        
-        latest_run_status = latest_run.status.value if latest_run else None
-        latest_run_error_message = latest_run.error_message if latest_run else None
+        latest_run_status = latest_run_status.value if latest_run_status else None
         
         header_summary = None
         if header:
@@ -102,14 +121,8 @@ class DocumentService:
         # Get sections for this document, ordered by start_serial_number (ascending), then by section_id
         # This ensures sections are displayed in serial number order, showing all occurrences
         # Only include sections with start_serial_number (no NULL values)
-        sections = self.db.query(DocumentSection).filter(
-            DocumentSection.document_id == document_id,
-            DocumentSection.start_serial_number.isnot(None)
-        ).order_by(
-            DocumentSection.start_serial_number.asc(),
-            DocumentSection.section_id
-        ).all()
-        sections_list = [DocumentSectionRead.model_validate(sec) for sec in sections] if sections else None
+        sections = get_sorted_sections(self.db, document_id)
+        sections_list = list(sections) if sections else None
         
         base = DocumentRead.model_validate(document)
         return DocumentDetail(
@@ -177,11 +190,18 @@ class DocumentService:
         
         # Apply pagination
         offset = (page - 1) * page_size
-        documents = query.order_by(order_field).offset(offset).limit(page_size).all()
+        rows = (
+            query.add_columns(_voter_count, _latest_run.status, _latest_run.error_message)
+            .outerjoin(_latest_run, true())
+            .order_by(order_field)
+            .offset(offset)
+            .limit(page_size)
+            .all()
+        )
         
         # Create DocumentDetail objects with header information
         items = []
-        for doc in documents:
+        for doc, voter_count, latest_run_status, latest_run_error_message in rows:
             header_summary = None
             if doc.header:
                 header_summary = {
@@ -200,23 +220,12 @@ class DocumentService:
                     "polling_station_building_and_address_english": doc.header.polling_station_building_and_address_english,
                 }
             
-            # Get voter count for this document
-            voter_count = self.db.query(Voter).filter(Voter.document_id == doc.id).count()
-            
-            # Get latest extraction run information
-            latest_run = self.db.query(ExtractionRun).filter(
-                ExtractionRun.document_id == doc.id
-            ).order_by(ExtractionRun.created_at.desc()).first()
-            
-            latest_run_status = latest_run.status.value if latest_run else None
-            latest_run_error_message = latest_run.error_message if latest_run else None
-            
             base = DocumentRead.model_validate(doc)
             detail = DocumentDetail(
                 **base.model_dump(),
                 header=header_summary,
                 voter_count=voter_count,
-                latest_run_status=latest_run_status,
+                latest_run_status=latest_run_status.value if latest_run_status else None,
                 latest_run_error_message=latest_run_error_message,
             )
             items.append(detail)
@@ -1,15 +1,22 @@
 """Extraction service for handling document extraction and processing."""
 
 import asyncio
+import functools
 import logging
 import time
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, selectinload
 
 from app.config import get_settings
+from app.core.sections import get_sorted_sections
+from app.core.voter_service import invalidate_voter_count_cache
 from app.models.core import (
     Document,
     DocumentHeader,
@@ -21,6 +28,7 @@ from app.models.core import (
     SegmentType,
     Voter,
 )
+from app.schemas.documents import DocumentSectionRead
 from app.schemas.extraction import (
     BulkRetryResponse,
     ExtractionRunListResponse,
@@ -30,19 +38,70 @@ from app.schemas.extraction import (
     SegmentRetryResponse,
     SegmentRetryStatusResponse,
 )
-from app.services.gemini_client import extract_segment, upload_file
+from app.services.gemini_client import (
+    extract_segment,
+    release_context_cache,
+    upload_file,
+    valid_list_items,
+)
 from app.db import SessionLocal
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Voter rows sent per INSERT statement when persisting a merged run
+_VOTER_INSERT_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class SegmentRetryOutcome:
+    """Result of persisting a segment response, as seen by the caller."""
+    
+    segment_type: SegmentType
+    status: SegmentStatus
+    parsed_header_json: dict | None
+    extraction_run_id: int
+    document_id: int | None
+
 
 class ExtractionService:
     """Service for extraction operations."""
     
+    # Dedicated pool for blocking Gemini calls so bulk extraction/retry cannot
+    # starve the default executor used by other asyncio.to_thread callers
+    _extract_pool = ThreadPoolExecutor(
+        max_workers=settings.gemini_concurrency, thread_name_prefix="extract"
+    )
+    
     def __init__(self, db: Session):
         self.db = db
     
+    async def _extract_segment_in_pool(
+        self,
+        file_uri: str,
+        mime_type: str,
+        seg_type: SegmentType,
+        page_start: int,
+        page_end: int,
+        sections: Sequence[DocumentSectionRead] | None = None,
+        use_context_cache: bool = True,
+    ) -> dict:
+        """Run the blocking extract_segment call on the extraction thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._extract_pool,
+            functools.partial(
+                extract_segment,
+                file_uri,
+                mime_type,
+                seg_type.name,
+                page_start,
+                page_end,
+                sections,
+                use_context_cache=use_context_cache,
+            ),
+        )
+    
     @staticmethod
     def _to_int(value: str | int | None) -> int | None:
         """
@@ -71,6 +130,31 @@ class ExtractionService:
                 return None
         return None
     
+    @staticmethod
+    def _valid_list_rows(rows: list | None, segment_id: int) -> list | None:
+        """
+        Drop list rows that don't match the blueprint's voter item schema.
+        
+        Args:
+            rows: The "list" value of a segment response (returned unchanged if not a list)
+            segment_id: Segment ID for logging
+            
+        Returns:
+            The schema-valid rows
+        """
+        if not isinstance(rows, list):
+            return rows
+        valid, first_error = valid_list_items(rows)
+        if len(valid) != len(rows):
+            logger.warning(
+                "Segment list rows rejected: segment_id=%s, rejected=%s, kept=%s, first_error=%s",
+                segment_id,
+                len(rows) - len(valid),
+                len(valid),
+                first_error,
+            )
+        return valid
+    
     def _deduplicate_and_validate_voters(self, all_rows: list[dict], document_id: int) -> list[dict]:
         """
         Intelligently deduplicate and validate voter rows based on sequential serial numbers.
@@ -102,7 +186,7 @@ class ExtractionService:
         rows_without_serial = [(s, r, i) for s, r, i in rows_with_serial if s is None]
         
         if not rows_with_valid_serial:
-            logger.warning(f"No valid serial numbers found in rows for document_id={document_id}")
+            logger.warning("No valid serial numbers found in rows for document_id=%s", document_id)
             return [r for _, r, _ in rows_without_serial]
         
         # Step 2: Validate sequential nature using samples
@@ -150,10 +234,16 @@ class ExtractionService:
                     expected_increment = most_common[0]
         
         logger.info(
-            f"Serial number validation for document_id={document_id}: "
-            f"total_rows={total_count}, first_2_valid={first_2_valid}, "
-            f"last_2_valid={last_2_valid}, middle_valid={middle_valid}, "
-            f"expected_increment={expected_increment}"
+            "Serial number validation for document_id=%s: "
+            "total_rows=%s, first_2_valid=%s, "
+            "last_2_valid=%s, middle_valid=%s, "
+            "expected_increment=%s",
+            document_id,
+            total_count,
+            first_2_valid,
+            last_2_valid,
+            middle_valid,
+            expected_increment,
         )
         
         # Step 3: Detect duplicates
@@ -167,8 +257,11 @@ class ExtractionService:
         
         if duplicates:
             logger.warning(
-                f"Found {len(duplicates)} duplicate serial_numbers in document_id={document_id}: "
-                f"duplicates={list(duplicates.keys())[:10]}"  # Log first 10
+                "Found %s duplicate serial_numbers in document_id=%s: "
+                "duplicates=%s",
+                len(duplicates),
+                document_id,
+                list(duplicates.keys())[:10],  # Log first 10
             )
         
         # Step 4: Deduplicate - keep first occurrence of each serial number
@@ -199,8 +292,12 @@ class ExtractionService:
                 
                 deduplicated_rows[serial_num] = best_row
                 logger.debug(
-                    f"Duplicate serial_number={serial_num} in document_id={document_id}: "
-                    f"kept best row with score={best_score} out of {len(row_list)} duplicates"
+                    "Duplicate serial_number=%s in document_id=%s: "
+                    "kept best row with score=%s out of %s duplicates",
+                    serial_num,
+                    document_id,
+                    best_score,
+                    len(row_list),
                 )
         
         # Step 5: Sort by serial number and detect gaps
@@ -224,15 +321,24 @@ class ExtractionService:
         
         if gaps:
             logger.warning(
-                f"Found {len(gaps)} gaps in serial numbers for document_id={document_id}: "
-                f"gaps={gaps[:5]}"  # Log first 5 gaps
+                "Found %s gaps in serial numbers for document_id=%s: "
+                "gaps=%s",
+                len(gaps),
+                document_id,
+                gaps[:5],  # Log first 5 gaps
             )
         
         if expected_count != actual_count:
             logger.info(
-                f"Serial number range for document_id={document_id}: "
-                f"min={min_serial}, max={max_serial}, expected_count={expected_count}, "
-                f"actual_count={actual_count}, missing={expected_count - actual_count}"
+                "Serial number range for document_id=%s: "
+                "min=%s, max=%s, expected_count=%s, "
+                "actual_count=%s, missing=%s",
+                document_id,
+                min_serial,
+                max_serial,
+                expected_count,
+                actual_count,
+                expected_count - actual_count,
             )
         
         # Step 6: Return deduplicated rows in serial number order
@@ -245,9 +351,13 @@ class ExtractionService:
             result.append(row)
         
         logger.info(
-            f"Deduplication complete for document_id={document_id}: "
-            f"original_rows={len(all_rows)}, deduplicated_rows={len(result)}, "
-            f"duplicates_removed={len(all_rows) - len(result)}"
+            "Deduplication complete for document_id=%s: "
+            "original_rows=%s, deduplicated_rows=%s, "
+            "duplicates_removed=%s",
+            document_id,
+            len(all_rows),
+            len(result),
+            len(all_rows) - len(result),
         )
         
         return result
@@ -263,12 +373,14 @@ class ExtractionService:
             return
         
         logger.info(
-            f"Section names from header stored (not creating sections yet): document_id={document_id}, "
-            f"section_names_count={len(section_names)}"
+            "Section names from header stored (not creating sections yet): document_id=%s, "
+            "section_names_count=%s",
+            document_id,
+            len(section_names),
         )
         # Sections will be created later when we have start_serial_number from list chunks
     
-    def _get_document_sections(self, document_id: int) -> list[DocumentSection]:
+    def _get_document_sections(self, document_id: int) -> tuple[DocumentSectionRead, ...]:
         """Get all sections for a document, ordered by start_serial_number (ascending), then by section_id.
         
         This ordering is important for range-based section matching in voter service.
@@ -276,14 +388,7 @@ class ExtractionService:
         """
         db = SessionLocal()
         try:
-            sections = db.query(DocumentSection).filter(
-                DocumentSection.document_id == document_id,
-                DocumentSection.start_serial_number.isnot(None)
-            ).order_by(
-                DocumentSection.start_serial_number.asc(),
-                DocumentSection.section_id
-            ).all()
-            return sections
+            return get_sorted_sections(db, document_id)
         finally:
             db.close()
     
@@ -365,21 +470,27 @@ class ExtractionService:
                 db.add(new_section)
                 inserted_count += 1
                 logger.debug(
-                    f"Created section: document_id={document_id}, section_id={section_id}, "
-                    f"start_serial={start_serial}"
+                    "Created section: document_id=%s, section_id=%s, "
+                    "start_serial=%s",
+                    document_id,
+                    section_id,
+                    start_serial,
                 )
             
             db.commit()
             logger.info(
-                f"Section start serial numbers processed: document_id={document_id}, "
-                f"sections_inserted={inserted_count}, skipped={skipped_count}"
+                "Section start serial numbers processed: document_id=%s, "
+                "sections_inserted=%s, skipped=%s",
+                document_id,
+                inserted_count,
+                skipped_count,
             )
         finally:
             db.close()
     
     def _check_duplicate_document(self, header_json: dict, document_id: int) -> Tuple[bool, str | None]:
         """Check if document is duplicate based on header data. Returns (is_duplicate, error_message)."""
-        state = header_json.get("state")
+        state = DocumentHeader.normalize_state(header_json.get("state"))
         part_number = header_json.get("part_number")
         ac_number = header_json.get("assembly_constituency_number") or {}
         ac_number_english = ac_number.get("english")
@@ -408,7 +519,7 @@ class ExtractionService:
     
     def _skip_duplicate_runs(self, header_json: dict, current_document_id: int, error_msg: str) -> None:
         """Skip all extraction runs for documents with the same state + constituency + part_number combination."""
-        state = header_json.get("state")
+        state = DocumentHeader.normalize_state(header_json.get("state"))
         part_number = header_json.get("part_number")
         ac_number = header_json.get("assembly_constituency_number") or {}
         ac_number_english = ac_number.get("english")
@@ -448,7 +559,7 @@ class ExtractionService:
                 if run.status not in (ExtractionRunStatus.COMPLETED, ExtractionRunStatus.SKIPPED):
                     run.status = ExtractionRunStatus.SKIPPED
                     run.error_message = error_msg
-                    run.finished_at = run.finished_at or datetime.utcnow()
+                    run.finished_at = run.finished_at or datetime.now(timezone.utc)
                     skipped_count += 1
                     
                     # Skip all remaining segments for this run
@@ -468,9 +579,15 @@ class ExtractionService:
             if skipped_count > 0:
                 db.commit()
                 logger.info(
-                    f"Skipped {skipped_count} extraction runs and {skipped_segments_count} segments for duplicate documents: "
-                    f"state={state}, constituency={ac_number_english}, part_number={part_number}, "
-                    f"document_ids={all_doc_ids}"
+                    "Skipped %s extraction runs and %s segments for duplicate documents: "
+                    "state=%s, constituency=%s, part_number=%s, "
+                    "document_ids=%s",
+                    skipped_count,
+                    skipped_segments_count,
+                    state,
+                    ac_number_english,
+                    part_number,
+                    all_doc_ids,
                 )
         finally:
             db.close()
@@ -481,34 +598,40 @@ class ExtractionService:
         seg_type: SegmentType, 
         parsed: dict, 
         extraction_run_id: int
-    ) -> None:
-        """Centralized handler for segment response processing."""
+    ) -> SegmentRetryOutcome | None:
+        """Centralized handler for segment response processing.
+        
+        Returns the persisted outcome so callers don't have to re-read the segment,
+        or None if the segment no longer exists.
+        """
         db = SessionLocal()
         try:
             segment = db.get(ExtractionSegment, segment_id)
             if not segment:
-                return
+                return None
             
             # Check if run is already skipped
             run = db.get(ExtractionRun, extraction_run_id)
+            document_id = run.document_id if run else None
             if run and run.status == ExtractionRunStatus.SKIPPED:
                 segment.status = SegmentStatus.SKIPPED
                 segment.raw_response_json = {"skipped": True, "reason": run.error_message or "Run was skipped"}
                 db.commit()
-                return
+                return SegmentRetryOutcome(seg_type, SegmentStatus.SKIPPED, None, extraction_run_id, document_id)
             
             # Persist segment results
+            header_json = parsed.get("header") if seg_type == SegmentType.HEADER else None
             segment.status = SegmentStatus.DONE
             segment.raw_response_json = parsed
             if seg_type == SegmentType.HEADER:
-                segment.parsed_header_json = parsed.get("header")  # type: ignore[assignment]
+                segment.parsed_header_json = header_json  # type: ignore[assignment]
             if "list" in parsed:
-                segment.parsed_list_json = parsed.get("list")  # type: ignore[assignment]
+                # raw_response_json keeps every row; only schema-valid rows are parsed
+                segment.parsed_list_json = self._valid_list_rows(parsed.get("list"), segment_id)  # type: ignore[assignment]
             db.commit()
             
             # Process header and sections for HEADER segments
-            if seg_type == SegmentType.HEADER and segment.parsed_header_json:
-                header_json = segment.parsed_header_json
+            if seg_type == SegmentType.HEADER and header_json:
                 if run:
                     # Check for duplicates BEFORE upserting header
                     is_duplicate, error_msg = self._check_duplicate_document(header_json, run.document_id)
@@ -521,11 +644,16 @@ class ExtractionService:
                         segment.raw_response_json = {"skipped": True, "reason": error_msg}
                         db.commit()
                         logger.info(
-                            f"Duplicate document detected in segment processing, skipping: "
-                            f"extraction_run_id={extraction_run_id}, document_id={run.document_id}, {error_msg}"
+                            "Duplicate document detected in segment processing, skipping: "
+                            "extraction_run_id=%s, document_id=%s, %s",
+                            extraction_run_id,
+                            document_id,
+                            error_msg,
                         )
                         # Don't upsert header for duplicate documents
-                        return
+                        return SegmentRetryOutcome(
+                            seg_type, SegmentStatus.SKIPPED, header_json, extraction_run_id, document_id
+                        )
                     
                     # Only upsert if not a duplicate
                     self._upsert_document_header(run.document_id, header_json)
@@ -535,6 +663,7 @@ class ExtractionService:
             
             # Update extraction run status
             self._update_extraction_run_status(extraction_run_id)
+            return SegmentRetryOutcome(seg_type, SegmentStatus.DONE, header_json, extraction_run_id, document_id)
         finally:
             db.close()
     
@@ -604,12 +733,16 @@ class ExtractionService:
         else:
             # No pages beyond header, or invalid page count
             logger.warning(
-                f"Invalid or missing page_count={page_count}, only creating header segment"
+                "Invalid or missing page_count=%s, only creating header segment",
+                page_count,
             )
         
         logger.info(
-            f"Built segments: page_count={page_count}, total_segments={len(segments)}, "
-            f"max_pages_per_call={max_pages_per_call}"
+            "Built segments: page_count=%s, total_segments=%s, "
+            "max_pages_per_call=%s",
+            page_count,
+            len(segments),
+            max_pages_per_call,
         )
         return segments
     
@@ -620,11 +753,12 @@ class ExtractionService:
         LIST_CHUNK segments if HEADER succeeds and no duplicate is found.
         """
         segment_start_time = time.time()
-        semaphore = asyncio.Semaphore(3)
+        # _extract_pool caps Gemini calls per process; this caps them per run
+        semaphore = asyncio.Semaphore(settings.gemini_concurrency)
         success_count = 0
         failure_count = 0
         
-        async def process_segment(seg_id: int, seg_type: SegmentType, page_start: int, page_end: int, sections: list[DocumentSection] | None = None) -> None:
+        async def process_segment(seg_id: int, seg_type: SegmentType, page_start: int, page_end: int, sections: Sequence[DocumentSectionRead] | None = None) -> None:
             nonlocal success_count, failure_count
             async with semaphore:
                 # Check if run is already skipped before processing
@@ -639,8 +773,10 @@ class ExtractionService:
                             segment_check.raw_response_json = {"skipped": True, "reason": run_check.error_message or "Run was skipped"}
                             db_check.commit()
                             logger.info(
-                                f"Segment skipped due to run being skipped: extraction_run_id={extraction_run_id}, "
-                                f"segment_id={seg_id}"
+                                "Segment skipped due to run being skipped: extraction_run_id=%s, "
+                                "segment_id=%s",
+                                extraction_run_id,
+                                seg_id,
                             )
                         return
                 finally:
@@ -654,49 +790,60 @@ class ExtractionService:
                         seg.status = SegmentStatus.RUNNING
                         db_mark.commit()
                         logger.debug(
-                            f"Segment marked as RUNNING: extraction_run_id={extraction_run_id}, "
-                            f"segment_id={seg_id}"
+                            "Segment marked as RUNNING: extraction_run_id=%s, "
+                            "segment_id=%s",
+                            extraction_run_id,
+                            seg_id,
                         )
                 finally:
                     db_mark.close()
                 
                 segment_process_start = time.time()
                 try:
-                    parsed = await asyncio.to_thread(
-                        extract_segment,
-                        file_uri,
-                        mime_type,
-                        seg_type.name,
-                        page_start,
-                        page_end,
-                        sections,
+                    parsed = await self._extract_segment_in_pool(
+                        file_uri, mime_type, seg_type, page_start, page_end, sections
                     )
                     # Use centralized response processing
                     self._process_segment_response(seg_id, seg_type, parsed, extraction_run_id)
                     success_count += 1
                     duration = time.time() - segment_process_start
                     logger.info(
-                        f"Segment completed: extraction_run_id={extraction_run_id}, "
-                        f"segment_id={seg_id}, segment_type={seg_type.name}, "
-                        f"pages={page_start}-{page_end}, duration={duration:.2f}s"
+                        "Segment completed: extraction_run_id=%s, "
+                        "segment_id=%s, segment_type=%s, "
+                        "pages=%s-%s, duration=%.2fs",
+                        extraction_run_id,
+                        seg_id,
+                        seg_type.name,
+                        page_start,
+                        page_end,
+                        duration,
                     )
                 except Exception as exc:  # pragma: no cover - defensive logging
                     failure_count += 1
                     duration = time.time() - segment_process_start
                     logger.error(
-                        f"Segment failed: extraction_run_id={extraction_run_id}, "
-                        f"segment_id={seg_id}, segment_type={seg_type.name}, "
-                        f"pages={page_start}-{page_end}, duration={duration:.2f}s, "
-                        f"error={type(exc).__name__}: {str(exc)}",
+                        "Segment failed: extraction_run_id=%s, "
+                        "segment_id=%s, segment_type=%s, "
+                        "pages=%s-%s, duration=%.2fs, "
+                        "error=%s: %s",
+                        extraction_run_id,
+                        seg_id,
+                        seg_type.name,
+                        page_start,
+                        page_end,
+                        duration,
+                        type(exc).__name__,
+                        exc,
                         exc_info=True,
                     )
                     db = SessionLocal()
                     try:
-                        segment = db.get(ExtractionSegment, seg_id)
-                        if segment:
-                            segment.status = SegmentStatus.FAILED
-                            segment.raw_response_json = {"error": str(exc)}
-                            db.commit()
+                        db.execute(
+                            update(ExtractionSegment)
+                            .where(ExtractionSegment.id == seg_id)
+                            .values(status=SegmentStatus.FAILED, raw_response_json={"error": str(exc)})
+                        )
+                        db.commit()
                     finally:
                         db.close()
                     
@@ -710,15 +857,18 @@ class ExtractionService:
             if not run:
                 return
             run.status = ExtractionRunStatus.RUNNING
-            run.started_at = run.started_at or datetime.utcnow()
+            run.started_at = run.started_at or datetime.now(timezone.utc)
             db.commit()
             db.refresh(run)
             
             segments = list(run.segments)
             total_segments = len(segments)
             logger.info(
-                f"Starting segment extraction: extraction_run_id={extraction_run_id}, "
-                f"document_id={run.document_id}, total_segments={total_segments}"
+                "Starting segment extraction: extraction_run_id=%s, "
+                "document_id=%s, total_segments=%s",
+                extraction_run_id,
+                run.document_id,
+                total_segments,
             )
         finally:
             db.close()
@@ -728,8 +878,10 @@ class ExtractionService:
         
         if header_segment:
             logger.info(
-                f"Processing HEADER segment first: extraction_run_id={extraction_run_id}, "
-                f"segment_id={header_segment.id}"
+                "Processing HEADER segment first: extraction_run_id=%s, "
+                "segment_id=%s",
+                extraction_run_id,
+                header_segment.id,
             )
             await process_segment(header_segment.id, header_segment.segment_type, header_segment.page_start, header_segment.page_end)
         
@@ -740,8 +892,10 @@ class ExtractionService:
                 run_check = db.get(ExtractionRun, extraction_run_id)
                 if run_check and run_check.status == ExtractionRunStatus.SKIPPED:
                     logger.info(
-                        f"Extraction run was skipped due to duplicate: extraction_run_id={extraction_run_id}, "
-                        f"document_id={run_check.document_id}"
+                        "Extraction run was skipped due to duplicate: extraction_run_id=%s, "
+                        "document_id=%s",
+                        extraction_run_id,
+                        run_check.document_id,
                     )
                     return  # Stop processing, don't process LIST chunks
             finally:
@@ -751,14 +905,16 @@ class ExtractionService:
         list_segments = [seg for seg in segments if seg.segment_type == SegmentType.LIST_CHUNK]
         if list_segments:
             logger.info(
-                f"Processing {len(list_segments)} LIST_CHUNK segments: extraction_run_id={extraction_run_id}"
+                "Processing %s LIST_CHUNK segments: extraction_run_id=%s",
+                len(list_segments),
+                extraction_run_id,
             )
             
             # Get sections from database for LIST_CHUNK processing
             db = SessionLocal()
             try:
                 run_for_sections = db.get(ExtractionRun, extraction_run_id)
-                sections_list: list[DocumentSection] = []
+                sections_list: Sequence[DocumentSectionRead] = ()
                 if run_for_sections:
                     sections_list = self._get_document_sections(run_for_sections.document_id)
             finally:
@@ -769,7 +925,20 @@ class ExtractionService:
                 for seg in list_segments
             ]
             if tasks:
-                await asyncio.gather(*tasks)
+                # process_segment records its own Gemini failures; anything else that
+                # escapes one segment must not abandon the others mid-flight
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                for seg, result in zip(list_segments, results):
+                    if isinstance(result, BaseException):
+                        logger.error(
+                            "Segment task crashed: extraction_run_id=%s, segment_id=%s, "
+                            "error=%s: %s",
+                            extraction_run_id,
+                            seg.id,
+                            type(result).__name__,
+                            result,
+                            exc_info=result,
+                        )
             
             # After all list chunks complete, update section start_serial_numbers
             self._process_section_start_positions(extraction_run_id)
@@ -779,10 +948,16 @@ class ExtractionService:
         
         total_duration = time.time() - segment_start_time
         logger.info(
-            f"Segment extraction completed: extraction_run_id={extraction_run_id}, "
-            f"total_segments={total_segments}, success={success_count}, "
-            f"failures={failure_count}, total_duration={total_duration:.2f}s, "
-            f"avg_duration_per_segment={total_duration/max(total_segments, 1):.2f}s"
+            "Segment extraction completed: extraction_run_id=%s, "
+            "total_segments=%s, success=%s, "
+            "failures=%s, total_duration=%.2fs, "
+            "avg_duration_per_segment=%.2fs",
+            extraction_run_id,
+            total_segments,
+            success_count,
+            failure_count,
+            total_duration,
+            total_duration / max(total_segments, 1),
         )
     
     def _upsert_document_header(self, document_id: int, header_json: dict) -> None:
@@ -822,7 +997,7 @@ class ExtractionService:
             header_model.raw_header_json = header_json
             db.merge(header_model)
             db.commit()
-            logger.info(f"Document header upserted: document_id={document_id}")
+            logger.info("Document header upserted: document_id=%s", document_id)
         finally:
             db.close()
     
@@ -847,10 +1022,13 @@ class ExtractionService:
                 run.status = ExtractionRunStatus.RUNNING
                 run.finished_at = None
                 db.commit()
-                logger.debug(
-                    f"Extraction run kept as RUNNING: extraction_run_id={extraction_run_id}, "
-                    f"unfinished_segments={sum(1 for s in segments if s.status in (SegmentStatus.PENDING, SegmentStatus.RUNNING))}"
-                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "Extraction run kept as RUNNING: extraction_run_id=%s, "
+                        "unfinished_segments=%s",
+                        extraction_run_id,
+                        sum(1 for s in segments if s.status in (SegmentStatus.PENDING, SegmentStatus.RUNNING)),
+                    )
                 return
             
             # All segments are terminal (DONE, FAILED, or SKIPPED), determine final status
@@ -875,22 +1053,27 @@ class ExtractionService:
             # Determine final status
             if all_done and has_header and has_list_data and not any_failed:
                 run.status = ExtractionRunStatus.COMPLETED
-                run.finished_at = run.finished_at or datetime.utcnow()
+                run.finished_at = run.finished_at or datetime.now(timezone.utc)
             elif any_done and (has_header or has_list_data):
                 run.status = ExtractionRunStatus.PARTIAL
                 if not run.finished_at:
-                    run.finished_at = datetime.utcnow()
+                    run.finished_at = datetime.now(timezone.utc)
             elif any_failed and not any_done:
                 run.status = ExtractionRunStatus.FAILED
                 run.error_message = f"All segments failed. Failed segments: {failed_segment_count}"
                 if not run.finished_at:
-                    run.finished_at = datetime.utcnow()
+                    run.finished_at = datetime.now(timezone.utc)
             
             db.commit()
             logger.debug(
-                f"Extraction run status updated: extraction_run_id={extraction_run_id}, "
-                f"status={run.status}, has_header={has_header}, "
-                f"list_segments_done={len(list_segments_done)}, failed={failed_segment_count}"
+                "Extraction run status updated: extraction_run_id=%s, "
+                "status=%s, has_header=%s, "
+                "list_segments_done=%s, failed=%s",
+                extraction_run_id,
+                run.status,
+                has_header,
+                len(list_segments_done),
+                failed_segment_count,
             )
         finally:
             db.close()
@@ -901,12 +1084,18 @@ class ExtractionService:
         try:
             run: ExtractionRun | None = db.get(ExtractionRun, extraction_run_id)
             if not run:
-                logger.warning(f"ExtractionRun not found for merge: extraction_run_id={extraction_run_id}")
+                logger.warning(
+                    "ExtractionRun not found for merge: extraction_run_id=%s",
+                    extraction_run_id,
+                )
                 return
             
             # Skip merging if run was skipped (e.g., duplicate document)
             if run.status == ExtractionRunStatus.SKIPPED:
-                logger.info(f"Skipping merge for skipped extraction run: extraction_run_id={extraction_run_id}")
+                logger.info(
+                    "Skipping merge for skipped extraction run: extraction_run_id=%s",
+                    extraction_run_id,
+                )
                 return
             
             document: Document = run.document
@@ -922,9 +1111,12 @@ class ExtractionService:
                 if s.segment_type == SegmentType.LIST_CHUNK and s.status == SegmentStatus.DONE
             ]
             logger.info(
-                f"Merging segments: extraction_run_id={extraction_run_id}, "
-                f"has_header={header_segment is not None}, "
-                f"list_segments_count={len(list_segments)}"
+                "Merging segments: extraction_run_id=%s, "
+                "has_header=%s, "
+                "list_segments_count=%s",
+                extraction_run_id,
+                header_segment is not None,
+                len(list_segments),
             )
             
             # Header is already upserted incrementally, so we just need to handle voters here
@@ -933,7 +1125,9 @@ class ExtractionService:
             
             for seg in list_segments:
                 # Extract voter rows
-                rows = seg.parsed_list_json or (seg.raw_response_json or {}).get("list") or []
+                rows = seg.parsed_list_json
+                if rows is None:
+                    rows = self._valid_list_rows((seg.raw_response_json or {}).get("list"), seg.id) or []
                 if isinstance(rows, list):
                     all_rows.extend(rows)
             
@@ -951,7 +1145,7 @@ class ExtractionService:
                 # Intelligently deduplicate and validate voters before inserting
                 validated_rows = self._deduplicate_and_validate_voters(all_rows, document.id)
                 
-                voter_models: list[Voter] = []
+                voter_rows: list[dict] = []
                 for row in validated_rows:
                     voter_name = row.get("voter_name") or {}
                     relation_name = row.get("relation_name") or {}
@@ -960,35 +1154,47 @@ class ExtractionService:
                     serial_num = row.get("serial_number")
                     age_val = row.get("age")
                     
-                    voter_models.append(
-                        Voter(
-                            document_id=document.id,
-                            serial_number=self._to_int(serial_num),
-                            house_number=row.get("house_number") or "",
-                            voter_name_local=voter_name.get("local") or "",
-                            voter_name_english=voter_name.get("english") or "",
-                            relation_type=row.get("relation_type") or "",
-                            relation_name_local=relation_name.get("local") or "",
-                            relation_name_english=relation_name.get("english") or "",
-                            gender=row.get("gender") or "",
-                            age=self._to_int(age_val),
-                            photo_id=row.get("photo_id") or "",
-                            raw_row_json=row,
-                        )
+                    voter_rows.append(
+                        {
+                            "document_id": document.id,
+                            "serial_number": self._to_int(serial_num),
+                            "house_number": row.get("house_number") or "",
+                            "voter_name_local": voter_name.get("local") or "",
+                            "voter_name_english": voter_name.get("english") or "",
+                            "relation_type": row.get("relation_type") or "",
+                            "relation_name_local": relation_name.get("local") or "",
+                            "relation_name_english": relation_name.get("english") or "",
+                            "gender": row.get("gender") or "",
+                            "age": self._to_int(age_val),
+                            "photo_id": row.get("photo_id") or "",
+                            "raw_row_json": row,
+                        }
                     )
                 
-                if voter_models:
-                    db.bulk_save_objects(voter_models)
+                if voter_rows:
+                    # Core multi-row INSERTs rather than ORM objects; ON CONFLICT keeps
+                    # uq_voter_doc_serial from failing the whole run on a repeated serial
+                    insert_stmt = pg_insert(Voter).on_conflict_do_nothing(
+                        constraint="uq_voter_doc_serial"
+                    )
+                    for start in range(0, len(voter_rows), _VOTER_INSERT_BATCH_SIZE):
+                        db.execute(insert_stmt, voter_rows[start:start + _VOTER_INSERT_BATCH_SIZE])
+                if voter_rows:
                     logger.info(
-                        f"Voters persisted: extraction_run_id={extraction_run_id}, "
-                        f"document_id={document.id}, deleted_old={deleted_count}, "
-                        f"inserted_new={len(voter_models)}"
+                        "Voters persisted: extraction_run_id=%s, "
+                        "document_id=%s, deleted_old=%s, "
+                        "inserted_new=%s",
+                        extraction_run_id,
+                        document.id,
+                        deleted_count,
+                        len(voter_rows),
                     )
             
             # Final status update (status is already updated incrementally, but ensure it's correct)
             self._update_extraction_run_status(extraction_run_id)
             
             db.commit()
+            invalidate_voter_count_cache()
         finally:
             db.close()
     
@@ -996,8 +1202,11 @@ class ExtractionService:
         """Orchestrate extraction for a single document."""
         extraction_start_time = time.time()
         logger.info(
-            f"Starting extraction for document: document_id={document_id}, "
-            f"filename={filename}, size_kb={len(file_bytes)/1024:.2f}KB"
+            "Starting extraction for document: document_id=%s, "
+            "filename=%s, size_kb=%.2fKB",
+            document_id,
+            filename,
+            len(file_bytes) / 1024,
         )
         
         db = SessionLocal()
@@ -1009,7 +1218,7 @@ class ExtractionService:
         try:
             document: Document | None = db.get(Document, document_id)
             if not document:
-                logger.warning(f"Document not found: document_id={document_id}")
+                logger.warning("Document not found: document_id=%s", document_id)
                 db.close()
                 return
             
@@ -1027,23 +1236,29 @@ class ExtractionService:
             db.commit()
             db.refresh(document)
             logger.info(
-                f"File uploaded to Gemini: document_id={document_id}, "
-                f"page_count={document.page_count}, upload_duration={upload_duration:.2f}s"
+                "File uploaded to Gemini: document_id=%s, "
+                "page_count=%s, upload_duration=%.2fs",
+                document_id,
+                document.page_count,
+                upload_duration,
             )
             
             # Step 3: Create ExtractionRun
             extraction_run = ExtractionRun(
                 document_id=document.id,
                 status=ExtractionRunStatus.PENDING,
-                started_at=datetime.utcnow(),
+                started_at=datetime.now(timezone.utc),
             )
             db.add(extraction_run)
             db.commit()
             db.refresh(extraction_run)
             extraction_run_id = extraction_run.id
             logger.info(
-                f"ExtractionRun created: run_id={extraction_run_id}, document_id={document_id}, "
-                f"page_count={document.page_count}"
+                "ExtractionRun created: run_id=%s, document_id=%s, "
+                "page_count=%s",
+                extraction_run_id,
+                document_id,
+                document.page_count,
             )
             
             # Step 4: Create segments based on actual page count
@@ -1064,14 +1279,19 @@ class ExtractionService:
             db.commit()
             db.refresh(extraction_run)
             logger.info(
-                f"Segments created: extraction_run_id={extraction_run_id}, "
-                f"total_segments={segment_count}"
+                "Segments created: extraction_run_id=%s, "
+                "total_segments=%s",
+                extraction_run_id,
+                segment_count,
             )
         except Exception as exc:
             # Mark document as failed if anything goes wrong early.
             logger.error(
-                f"Extraction failed early: document_id={document_id}, "
-                f"error={type(exc).__name__}: {str(exc)}",
+                "Extraction failed early: document_id=%s, "
+                "error=%s: %s",
+                document_id,
+                type(exc).__name__,
+                exc,
                 exc_info=True,
             )
             try:
@@ -1096,23 +1316,34 @@ class ExtractionService:
         # Verify we have the required values before proceeding
         if not file_uri or not final_mime_type or not extraction_run_id:
             logger.error(
-                f"Missing required values after extraction setup: "
-                f"file_uri={file_uri}, mime_type={final_mime_type}, "
-                f"extraction_run_id={extraction_run_id}"
+                "Missing required values after extraction setup: "
+                "file_uri=%s, mime_type=%s, "
+                "extraction_run_id=%s",
+                file_uri,
+                final_mime_type,
+                extraction_run_id,
             )
             return
         
         # Step 4: Run async extraction over all segments
         extraction_segments_start = time.time()
-        await self._run_extraction_segments_async(
-            extraction_run_id=extraction_run_id,
-            file_uri=file_uri,
-            mime_type=final_mime_type,
-        )
+        try:
+            await self._run_extraction_segments_async(
+                extraction_run_id=extraction_run_id,
+                file_uri=file_uri,
+                mime_type=final_mime_type,
+            )
+        finally:
+            # All segments are done with the file's Gemini context cache
+            await asyncio.get_running_loop().run_in_executor(
+                self._extract_pool, release_context_cache, file_uri
+            )
         extraction_segments_duration = time.time() - extraction_segments_start
         logger.info(
-            f"Segment extraction finished: extraction_run_id={extraction_run_id}, "
-            f"duration={extraction_segments_duration:.2f}s"
+            "Segment extraction finished: extraction_run_id=%s, "
+            "duration=%.2fs",
+            extraction_run_id,
+            extraction_segments_duration,
         )
         
         # Step 5: Merge and persist
@@ -1122,12 +1353,16 @@ class ExtractionService:
         total_extraction_duration = time.time() - extraction_start_time
         
         logger.info(
-            f"Merge and persist completed: extraction_run_id={extraction_run_id}, "
-            f"merge_duration={merge_duration:.2f}s"
+            "Merge and persist completed: extraction_run_id=%s, "
+            "merge_duration=%.2fs",
+            extraction_run_id,
+            merge_duration,
         )
         logger.info(
-            f"Extraction completed: document_id={document_id}, "
-            f"total_duration={total_extraction_duration:.2f}s"
+            "Extraction completed: document_id=%s, "
+            "total_duration=%.2fs",
+            document_id,
+            total_extraction_duration,
         )
     
     def list_extraction_runs(
@@ -1150,7 +1385,14 @@ class ExtractionService:
         
         # Apply pagination
         offset = (page - 1) * page_size
-        runs = query.order_by(ExtractionRun.created_at.desc()).offset(offset).limit(page_size).all()
+        # Load all segments for the page in one extra query instead of one per run
+        runs = (
+            query.options(selectinload(ExtractionRun.segments))
+            .order_by(ExtractionRun.created_at.desc())
+            .offset(offset)
+            .limit(page_size)
+            .all()
+        )
         
         items = []
         for run in runs:
@@ -1160,8 +1402,14 @@ class ExtractionService:
             items.append(run_read)
         
         logger.info(
-            f"Extraction runs list: page={page}, page_size={page_size}, "
-            f"document_id={document_id}, status={status}, total={total}, returned={len(items)}"
+            "Extraction runs list: page=%s, page_size=%s, "
+            "document_id=%s, status=%s, total=%s, returned=%s",
+            page,
+            page_size,
+            document_id,
+            status,
+            total,
+            len(items),
         )
         
         return ExtractionRunListResponse(
@@ -1242,10 +1490,19 @@ class ExtractionService:
                 total_extraction_time = sum(extraction_times)
         
         logger.info(
-            f"Metrics summary: documents={total_documents}, runs={total_runs}, "
-            f"completed={completed_runs}, partial={partial_runs}, failed={failed_runs}, "
-            f"voters={total_voters}, segments={total_segments}, failed_segments={failed_segments}, "
-            f"error_rate={gemini_error_rate:.2f}%"
+            "Metrics summary: documents=%s, runs=%s, "
+            "completed=%s, partial=%s, failed=%s, "
+            "voters=%s, segments=%s, failed_segments=%s, "
+            "error_rate=%.2f%%",
+            total_documents,
+            total_runs,
+            completed_runs,
+            partial_runs,
+            failed_runs,
+            total_voters,
+            total_segments,
+            failed_segments,
+            gemini_error_rate,
         )
         
         return MetricsSummary(
@@ -1310,7 +1567,11 @@ class ExtractionService:
             document.mime_type or "application/pdf"
         )
         
-        logger.info(f"Segment retry initiated: segment_id={segment_id}, document_id={document.id}")
+        logger.info(
+            "Segment retry initiated: segment_id=%s, document_id=%s",
+            segment_id,
+            document.id,
+        )
         
         return SegmentRetryResponse(
             message="Segment retry initiated",
@@ -1329,22 +1590,33 @@ class ExtractionService:
         if not document.upload_file_uri:
             raise ValueError("Document file URI not available")
         
-        # Get all failed segments for this document
-        failed_segments = []
-        retryable_segments = []
-        non_retryable_segments = []
-        
-        for extraction_run in document.extraction_runs:
-            for segment in extraction_run.segments:
-                if segment.status == SegmentStatus.FAILED:
-                    failed_segments.append(segment)
-                    can_retry, reason = self._can_retry_segment(segment)
-                    if can_retry:
-                        retryable_segments.append(segment)
-                    else:
-                        non_retryable_segments.append((segment, reason))
-        
-        if not failed_segments:
+        # Get all failed segments for this document, splitting on the 48-hour
+        # retry window in SQL so no segment rows are loaded just to be discarded
+        time_limit = datetime.now(timezone.utc) - timedelta(hours=48)
+        failed_segment_ids_query = (
+            self.db.query(ExtractionSegment.id)
+            .join(ExtractionRun, ExtractionSegment.extraction_run_id == ExtractionRun.id)
+            .filter(
+                ExtractionRun.document_id == document_id,
+                ExtractionSegment.status == SegmentStatus.FAILED,
+            )
+            .order_by(ExtractionSegment.id)
+        )
+        retryable_segment_ids = [
+            segment_id
+            for (segment_id,) in failed_segment_ids_query.filter(
+                ExtractionSegment.updated_at >= time_limit
+            ).all()
+        ]
+        non_retryable_segments = [
+            (segment_id, "Retry time limit exceeded (48 hours)")
+            for (segment_id,) in failed_segment_ids_query.filter(
+                ExtractionSegment.updated_at < time_limit
+            ).all()
+        ]
+        failed_segments_count = len(retryable_segment_ids) + len(non_retryable_segments)
+        
+        if not failed_segments_count:
             return BulkRetryResponse(
                 message="No failed segments found for document",
                 document_id=document_id,
@@ -1353,42 +1625,44 @@ class ExtractionService:
                 non_retryable_segments_count=0
             )
         
-        if not retryable_segments:
+        if not retryable_segment_ids:
             return BulkRetryResponse(
                 message="No retryable segments found (all exceed time limit or wrong status)",
                 document_id=document_id,
-                failed_segments_count=len(failed_segments),
+                failed_segments_count=failed_segments_count,
                 retryable_segments_count=0,
                 non_retryable_segments_count=len(non_retryable_segments),
                 non_retryable_reasons=[
-                    {"segment_id": seg.id, "reason": reason} 
-                    for seg, reason in non_retryable_segments
+                    {"segment_id": segment_id, "reason": reason} 
+                    for segment_id, reason in non_retryable_segments
                 ]
             )
         
         # Start retry for all retryable segments
-        for segment in retryable_segments:
+        for segment_id in retryable_segment_ids:
             await self._retry_segment_async(
-                segment.id,
+                segment_id,
                 document.upload_file_uri,
                 document.mime_type or "application/pdf"
             )
         
         logger.info(
-            f"Bulk segment retry initiated: document_id={document_id}, "
-            f"retrying {len(retryable_segments)} segments"
+            "Bulk segment retry initiated: document_id=%s, "
+            "retrying %s segments",
+            document_id,
+            len(retryable_segment_ids),
         )
         
         return BulkRetryResponse(
-            message=f"Retry initiated for {len(retryable_segments)} failed segments",
+            message=f"Retry initiated for {len(retryable_segment_ids)} failed segments",
             document_id=document_id,
-            failed_segments_count=len(failed_segments),
-            retryable_segments_count=len(retryable_segments),
+            failed_segments_count=failed_segments_count,
+            retryable_segments_count=len(retryable_segment_ids),
             non_retryable_segments_count=len(non_retryable_segments),
-            retryable_segment_ids=[seg.id for seg in retryable_segments],
+            retryable_segment_ids=retryable_segment_ids,
             non_retryable_reasons=[
-                {"segment_id": seg.id, "reason": reason} 
-                for seg, reason in non_retryable_segments
+                {"segment_id": segment_id, "reason": reason} 
+                for segment_id, reason in non_retryable_segments
             ]
         )
     
@@ -1400,15 +1674,15 @@ class ExtractionService:
         
         can_retry, reason = self._can_retry_segment(segment)
         
-        # Calculate time remaining for retry
-        now = datetime.now(timezone.utc)
-        
         # Ensure segment.updated_at is timezone-aware
         segment_updated = segment.updated_at
         if segment_updated.tzinfo is None:
             segment_updated = segment_updated.replace(tzinfo=timezone.utc)
         
-        hours_since_failure = (now - segment_updated).total_seconds() / 3600
+        # Calculate time remaining for retry on plain epoch seconds; only the
+        # ISO fields in the response need datetime objects
+        updated_ts = segment_updated.timestamp()
+        hours_since_failure = (time.time() - updated_ts) / 3600
         hours_remaining = max(0, 48 - hours_since_failure)
         
         return SegmentRetryStatusResponse(
@@ -1419,21 +1693,22 @@ class ExtractionService:
             last_updated=segment_updated.isoformat(),
             hours_since_failure=round(hours_since_failure, 2),
             hours_remaining_for_retry=round(hours_remaining, 2),
-            retry_deadline=(segment_updated + timedelta(hours=48)).isoformat()
+            retry_deadline=datetime.fromtimestamp(updated_ts + 48 * 3600, tz=timezone.utc).isoformat()
         )
     
     async def _retry_segment_async(self, segment_id: int, file_uri: str, mime_type: str) -> None:
         """Retry processing a single failed segment."""
         semaphore = asyncio.Semaphore(1)  # Single segment retry
         
-        async def process_single_segment(seg_id: int, seg_type: SegmentType, page_start: int, page_end: int, sections: list[DocumentSection] | None = None) -> bool:
+        async def process_single_segment(seg_id: int, seg_type: SegmentType, page_start: int, page_end: int, sections: Sequence[DocumentSectionRead] | None = None) -> SegmentRetryOutcome | None:
             async with semaphore:
                 # Check if run is already skipped before processing
                 db_check = SessionLocal()
                 try:
                     segment_check = db_check.get(ExtractionSegment, seg_id)
                     if not segment_check:
-                        return False
+                        return None
+                    extraction_run_id_local = segment_check.extraction_run_id
                     run_check = db_check.get(ExtractionRun, segment_check.extraction_run_id)
                     if run_check and run_check.status == ExtractionRunStatus.SKIPPED:
                         # Mark segment as skipped
@@ -1442,124 +1717,135 @@ class ExtractionService:
                             segment_check.raw_response_json = {"skipped": True, "reason": run_check.error_message or "Run was skipped"}
                             db_check.commit()
                             logger.info(
-                                f"Segment retry skipped due to run being skipped: segment_id={seg_id}"
+                                "Segment retry skipped due to run being skipped: segment_id=%s",
+                                seg_id,
                             )
-                        return False
+                        return None
                 finally:
                     db_check.close()
                 
                 segment_process_start = time.time()
                 try:
-                    parsed = await asyncio.to_thread(
-                        extract_segment,
-                        file_uri,
-                        mime_type,
-                        seg_type.name,
-                        page_start,
-                        page_end,
-                        sections,
+                    # A single-segment call would pay to create a context cache it can't reuse
+                    parsed = await self._extract_segment_in_pool(
+                        file_uri, mime_type, seg_type, page_start, page_end, sections,
+                        use_context_cache=False,
                     )
                     
-                    # Get extraction_run_id for centralized processing
-                    db = SessionLocal()
-                    try:
-                        segment = db.get(ExtractionSegment, seg_id)
-                        if not segment:
-                            return False
-                        extraction_run_id_local = segment.extraction_run_id
-                    finally:
-                        db.close()
-                    
                     # Use centralized response processing
-                    self._process_segment_response(seg_id, seg_type, parsed, extraction_run_id_local)
+                    outcome = self._process_segment_response(seg_id, seg_type, parsed, extraction_run_id_local)
+                    if outcome is None:
+                        return None
                     
                     duration = time.time() - segment_process_start
                     logger.info(
-                        f"Segment retry successful: segment_id={seg_id}, "
-                        f"segment_type={seg_type.name}, pages={page_start}-{page_end}, "
-                        f"duration={duration:.2f}s"
+                        "Segment retry successful: segment_id=%s, "
+                        "segment_type=%s, pages=%s-%s, "
+                        "duration=%.2fs",
+                        seg_id,
+                        seg_type.name,
+                        page_start,
+                        page_end,
+                        duration,
                     )
-                    return True
+                    return outcome
                         
                 except Exception as exc:
                     duration = time.time() - segment_process_start
                     logger.error(
-                        f"Segment retry failed: segment_id={seg_id}, "
-                        f"segment_type={seg_type.name}, pages={page_start}-{page_end}, "
-                        f"duration={duration:.2f}s, error={type(exc).__name__}: {str(exc)}",
+                        "Segment retry failed: segment_id=%s, "
+                        "segment_type=%s, pages=%s-%s, "
+                        "duration=%.2fs, error=%s: %s",
+                        seg_id,
+                        seg_type.name,
+                        page_start,
+                        page_end,
+                        duration,
+                        type(exc).__name__,
+                        exc,
                         exc_info=True,
                     )
                     
                     # Update segment with failure
                     db = SessionLocal()
                     try:
-                        segment = db.get(ExtractionSegment, seg_id)
-                        if segment:
-                            segment.status = SegmentStatus.FAILED
-                            segment.raw_response_json = {"error": str(exc)}
-                            db.commit()
+                        db.execute(
+                            update(ExtractionSegment)
+                            .where(ExtractionSegment.id == seg_id)
+                            .values(status=SegmentStatus.FAILED, raw_response_json={"error": str(exc)})
+                        )
+                        db.commit()
                     finally:
                         db.close()
-                    return False
+                    return None
         
         # Get segment details
         db = SessionLocal()
         try:
-            segment = db.get(ExtractionSegment, segment_id)
+            # Reset segment status to RUNNING and read back the row in one round-trip
+            segment = db.execute(
+                update(ExtractionSegment)
+                .where(ExtractionSegment.id == segment_id)
+                .values(
+                    status=SegmentStatus.RUNNING,
+                    raw_response_json=None,
+                    parsed_header_json=None,
+                    parsed_list_json=None,
+                )
+                .returning(ExtractionSegment)
+            ).scalar_one_or_none()
             if not segment:
-                logger.error(f"Segment not found for retry: segment_id={segment_id}")
+                logger.error("Segment not found for retry: segment_id=%s", segment_id)
                 return
-                
-            # Reset segment status to RUNNING
-            segment.status = SegmentStatus.RUNNING
-            segment.raw_response_json = None
-            segment.parsed_header_json = None
-            segment.parsed_list_json = None
+            
+            # Capture what we need before commit expires the instance
+            seg_type = segment.segment_type
+            page_start = segment.page_start
+            page_end = segment.page_end
+            extraction_run_id = segment.extraction_run_id
             db.commit()
-            db.refresh(segment)
             
-            logger.info(f"Starting segment retry: segment_id={segment_id}")
+            logger.info("Starting segment retry: segment_id=%s", segment_id)
             
             # Get sections from database if retrying a LIST_CHUNK segment
-            sections_list: list[DocumentSection] = []
-            if segment.segment_type == SegmentType.LIST_CHUNK:
-                extraction_run_id = segment.extraction_run_id
+            sections_list: Sequence[DocumentSectionRead] = ()
+            if seg_type == SegmentType.LIST_CHUNK:
                 run_for_sections = db.get(ExtractionRun, extraction_run_id)
                 if run_for_sections:
                     sections_list = self._get_document_sections(run_for_sections.document_id)
             
             # Process the segment
-            success = await process_single_segment(
-                segment.id, segment.segment_type, segment.page_start, segment.page_end, sections_list if sections_list else None
+            outcome = await process_single_segment(
+                segment_id, seg_type, page_start, page_end, sections_list if sections_list else None
             )
             
-            if success:
-                logger.info(f"Segment retry completed successfully: segment_id={segment_id}")
-                extraction_run_id = segment.extraction_run_id
+            if outcome is not None:
+                logger.info("Segment retry completed successfully: segment_id=%s", segment_id)
+                extraction_run_id = outcome.extraction_run_id
                 
                 # If this was a HEADER segment retry, check for duplicates
-                if segment.segment_type == SegmentType.HEADER:
-                    db_check = SessionLocal()
-                    try:
-                        header_seg = db_check.get(ExtractionSegment, segment_id)
-                        if header_seg and header_seg.status == SegmentStatus.DONE and header_seg.parsed_header_json:
-                            header_json = header_seg.parsed_header_json
-                            run = db_check.get(ExtractionRun, extraction_run_id)
-                            if run:
-                                is_duplicate, error_msg = self._check_duplicate_document(header_json, run.document_id)
-                                if is_duplicate:
-                                    # Skip all runs for documents with the same combination
-                                    self._skip_duplicate_runs(header_json, run.document_id, error_msg)
-                                    logger.info(
-                                        f"Duplicate document detected after header retry: extraction_run_id={extraction_run_id}, "
-                                        f"document_id={run.document_id}, {error_msg}"
-                                    )
-                                    return  # Don't process list chunks or merge
-                    finally:
-                        db_check.close()
+                if (
+                    outcome.segment_type == SegmentType.HEADER
+                    and outcome.status == SegmentStatus.DONE
+                    and outcome.parsed_header_json
+                    and outcome.document_id is not None
+                ):
+                    header_json = outcome.parsed_header_json
+                    is_duplicate, error_msg = self._check_duplicate_document(header_json, outcome.document_id)
+                    if is_duplicate:
+                        # Skip all runs for documents with the same combination
+                        self._skip_duplicate_runs(header_json, outcome.document_id, error_msg)
+                        logger.info(
+                            "Duplicate document detected after header retry: extraction_run_id=%s, "
+                            "document_id=%s, %s",
+                            extraction_run_id,
+                            outcome.document_id,
+                            error_msg,
+                        )
+                        return  # Don't process list chunks or merge
                 
                 # If this was a LIST_CHUNK retry, update section start_serial_numbers
-                if segment.segment_type == SegmentType.LIST_CHUNK:
+                if outcome.segment_type == SegmentType.LIST_CHUNK:
                     self._process_section_start_positions(extraction_run_id)
                 
                 # Update extraction run status after retry
@@ -1568,11 +1854,13 @@ class ExtractionService:
                 # After successful retry, merge segments to update voters and final status
                 self._merge_segments_and_persist(extraction_run_id=extraction_run_id)
                 logger.info(
-                    f"Segments merged after retry: segment_id={segment_id}, "
-                    f"extraction_run_id={extraction_run_id}"
+                    "Segments merged after retry: segment_id=%s, "
+                    "extraction_run_id=%s",
+                    segment_id,
+                    extraction_run_id,
                 )
             else:
-                logger.error(f"Segment retry failed: segment_id={segment_id}")
+                logger.error("Segment retry failed: segment_id=%s", segment_id)
                 
         finally:
             db.close()
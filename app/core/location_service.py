@@ -28,7 +28,7 @@ class LocationService:
         
         state_list = [state[0] for state in states if state[0]]
         
-        logger.info(f"States list: returned {len(state_list)} states")
+        logger.info("States list: returned %s states", len(state_list))
         
         return {"states": state_list}
     
@@ -59,6 +59,10 @@ class LocationService:
                     "display_name": f"{const[0]} - {const[2] or const[3] or 'Unknown'}"
                 })
         
-        logger.info(f"Constituencies list: state={state}, returned {len(constituency_list)} constituencies")
+        logger.info(
+            "Constituencies list: state=%s, returned %s constituencies",
+            state,
+            len(constituency_list),
+        )
         
         return {"constituencies": constituency_list}
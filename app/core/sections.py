@@ -0,0 +1,25 @@
+"""Queries for a document's ordered sections."""
+
+from sqlalchemy.orm import Session
+
+from app.models.core import DocumentSection
+from app.schemas.documents import DocumentSectionRead
+
+
+def get_sorted_sections(db: Session, document_id: int) -> tuple[DocumentSectionRead, ...]:
+    """
+    Get all sections for a document, ordered by start_serial_number (ascending), then by section_id.
+
+    Only sections with a start_serial_number are included. Not cached across requests:
+    sections are rewritten by extraction runs in any worker process, so a per-process
+    cache can't be invalidated reliably. Callers that need them repeatedly (e.g. every
+    segment of a run) load them once and pass them along.
+    """
+    rows = db.query(DocumentSection).filter(
+        DocumentSection.document_id == document_id,
+        DocumentSection.start_serial_number.isnot(None)
+    ).order_by(
+        DocumentSection.start_serial_number.asc(),
+        DocumentSection.section_id
+    ).all()
+    return tuple(DocumentSectionRead.model_validate(row) for row in rows)
@@ -1,6 +1,7 @@
 """Service for managing API key settings."""
 
 import logging
+from types import MappingProxyType
 from typing import Optional, List
 
 from sqlalchemy.orm import Session
@@ -12,18 +13,25 @@ from app.core.encryption import encrypt_api_key, decrypt_api_key
 logger = logging.getLogger(__name__)
 
 
+def _invalidate_cached_clients() -> None:
+    """Make clients built from a stored key pick up the change in this process."""
+    # Imported here: gemini_client imports this module
+    from app.services.gemini_client import invalidate_gemini_client
+    invalidate_gemini_client()
+
+
 class SettingsService:
     """Service for API key settings operations."""
     
-    # Provider-specific configuration
-    PROVIDER_CONFIG = {
-        ApiKeyProvider.GEMINI: {
+    # Provider-specific configuration (read-only)
+    PROVIDER_CONFIG = MappingProxyType({
+        ApiKeyProvider.GEMINI: MappingProxyType({
             "key_generation_url": "https://aistudio.google.com/app/api-keys",
-        },
-        ApiKeyProvider.GPT: {
+        }),
+        ApiKeyProvider.GPT: MappingProxyType({
             "key_generation_url": "https://platform.openai.com/api-keys",
-        },
-    }
+        }),
+    })
     
     @staticmethod
     def mask_api_key(api_key: str) -> str:
@@ -38,7 +46,7 @@ class SettingsService:
         """
         if not api_key or len(api_key) <= 7:
             return "*" * 12  # Return 12 asterisks if key is too short
-        return api_key[:7] + "*" * (len(api_key) - 7)
+        return api_key[:7].ljust(len(api_key), "*")
     
     def __init__(self, db: Session):
         self.db = db
@@ -109,8 +117,9 @@ class SettingsService:
                 if is_active is not None:
                     existing.is_active = is_active
                 self.db.commit()
+                _invalidate_cached_clients()
                 self.db.refresh(existing)
-                logger.info(f"Updated API key for provider: {provider.value}")
+                logger.info("Updated API key for provider: %s", provider.value)
                 return existing
             else:
                 # Create new
@@ -121,8 +130,9 @@ class SettingsService:
                 )
                 self.db.add(new_setting)
                 self.db.commit()
+                _invalidate_cached_clients()
                 self.db.refresh(new_setting)
-                logger.info(f"Created API key for provider: {provider.value}")
+                logger.info("Created API key for provider: %s", provider.value)
                 
                 # If this is set as active, deactivate others
                 if new_setting.is_active:
@@ -131,13 +141,31 @@ class SettingsService:
                 return new_setting
         except IntegrityError as e:
             self.db.rollback()
-            logger.error(f"Integrity error creating/updating API key: {str(e)}")
+            logger.error("Integrity error creating/updating API key: %s", e)
             raise ValueError(f"Failed to create/update API key: {str(e)}") from e
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Error creating/updating API key: {str(e)}", exc_info=True)
+            logger.error("Error creating/updating API key: %s", e, exc_info=True)
             raise ValueError(f"Failed to create/update API key: {str(e)}") from e
     
+    def get_encrypted_api_key(self, provider: ApiKeyProvider) -> Optional[str]:
+        """
+        Get the stored (still encrypted) API key for a provider, regardless of active status.
+        
+        A single-column read with no decryption, cheap enough to check on every call
+        whether a cached client still matches the stored key.
+        
+        Args:
+            provider: Provider type to get key for
+            
+        Returns:
+            Encrypted API key or None if not found
+        """
+        row = self.db.query(ApiKeySettings.encrypted_api_key).filter(
+            ApiKeySettings.provider_type == provider
+        ).first()
+        return row[0] if row else None
+    
     def get_active_api_key(self, provider: ApiKeyProvider) -> Optional[str]:
         """
         Get decrypted API key for the active provider.
@@ -155,7 +183,7 @@ class SettingsService:
         try:
             return decrypt_api_key(setting.encrypted_api_key)
         except Exception as e:
-            logger.error(f"Failed to decrypt API key for {provider.value}: {str(e)}", exc_info=True)
+            logger.error("Failed to decrypt API key for %s: %s", provider.value, e, exc_info=True)
             return None
     
     def get_any_api_key(self, provider: ApiKeyProvider) -> Optional[str]:
@@ -176,7 +204,7 @@ class SettingsService:
         try:
             return decrypt_api_key(setting.encrypted_api_key)
         except Exception as e:
-            logger.error(f"Failed to decrypt API key for {provider.value}: {str(e)}", exc_info=True)
+            logger.error("Failed to decrypt API key for %s: %s", provider.value, e, exc_info=True)
             return None
     
     def get_masked_api_key(self, provider: ApiKeyProvider) -> Optional[str]:
@@ -198,7 +226,12 @@ class SettingsService:
             decrypted_key = decrypt_api_key(setting.encrypted_api_key)
             return self.mask_api_key(decrypted_key)
         except Exception as e:
-            logger.error(f"Failed to get masked API key for {provider.value}: {str(e)}", exc_info=True)
+            logger.error(
+                "Failed to get masked API key for %s: %s",
+                provider.value,
+                e,
+                exc_info=True,
+            )
             return None
     
     def set_active_provider(self, provider: ApiKeyProvider) -> ApiKeySettings:
@@ -224,8 +257,9 @@ class SettingsService:
         # Activate this provider
         setting.is_active = True
         self.db.commit()
+        _invalidate_cached_clients()
         self.db.refresh(setting)
-        logger.info(f"Activated provider: {provider.value}")
+        logger.info("Activated provider: %s", provider.value)
         return setting
     
     def delete_api_key(self, provider: ApiKeyProvider) -> bool:
@@ -244,7 +278,8 @@ class SettingsService:
         
         self.db.delete(setting)
         self.db.commit()
-        logger.info(f"Deleted API key for provider: {provider.value}")
+        _invalidate_cached_clients()
+        logger.info("Deleted API key for provider: %s", provider.value)
         return True
     
     def _deactivate_other_providers(self, active_provider: ApiKeyProvider) -> None:
@@ -253,4 +288,5 @@ class SettingsService:
             ApiKeySettings.provider_type != active_provider
         ).update({"is_active": False})
         self.db.commit()
+        _invalidate_cached_clients()
 
@@ -1,88 +1,222 @@
 """Voter service for handling voter-related business logic."""
 
+import base64
 import csv
+import hashlib
 import io
+import json
 import logging
-from typing import Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import DateTime, Select, String, and_, cast, false, func, or_, select, true, tuple_
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, aliased
 
+from app.core.ttl_cache import TTLCache
 from app.models.core import DocumentHeader, DocumentSection, Voter
 from app.schemas.documents import DocumentSectionRead
 from app.schemas.voters import VoterListResponse, VoterRead
 
 logger = logging.getLogger(__name__)
 
+# Short-lived cache of list_voters totals keyed by the filter set, so paging through
+# the same result set does not rerun the COUNT(*) on every page. It is per process:
+# invalidate_voter_count_cache only clears the worker that ran the merge, so other
+# gunicorn workers may report a total up to _COUNT_CACHE_TTL_SECONDS stale after an
+# extraction finishes. Keep this to a few seconds.
+_COUNT_CACHE_TTL_SECONDS = 5
+_count_cache = TTLCache(maxsize=1024, ttl_seconds=_COUNT_CACHE_TTL_SECONDS)
+_count_cache_version = 0
+
+# Rows fetched per round trip (and encoded per yielded chunk) when streaming CSV exports
+_EXPORT_BATCH_SIZE = 1000
+
+# The section a voter belongs to is the one with the greatest start_serial_number
+# <= the voter's serial_number (ties go to the higher section_id). Resolved per row
+# with a LATERAL subquery so Postgres can seek ix_document_sections_doc_start_desc
+# instead of shipping every section of every document to Python.
+_voter_section = aliased(
+    DocumentSection,
+    select(DocumentSection)
+    .where(
+        DocumentSection.document_id == Voter.document_id,
+        DocumentSection.start_serial_number <= Voter.serial_number,
+    )
+    .order_by(DocumentSection.start_serial_number.desc(), DocumentSection.section_id.desc())
+    .limit(1)
+    .lateral("voter_section"),
+)
+
+# Columns selected for list_voters rows; VoterRead is built straight from these rather
+# than from hydrated ORM entities
+_LIST_COLUMNS = (
+    Voter.id,
+    Voter.document_id,
+    Voter.serial_number,
+    Voter.house_number,
+    Voter.voter_name_local,
+    Voter.voter_name_english,
+    Voter.relation_type,
+    Voter.relation_name_local,
+    Voter.relation_name_english,
+    Voter.gender,
+    Voter.age,
+    Voter.photo_id,
+    Voter.created_at,
+    Voter.updated_at,
+    DocumentHeader.state,
+    DocumentHeader.assembly_constituency_number_english,
+    DocumentHeader.assembly_constituency_name_english,
+    DocumentHeader.part_number,
+)
+_LIST_SECTION_COLUMNS = (
+    _voter_section.id.label("document_section_id"),
+    _voter_section.section_id,
+    _voter_section.section_name_local,
+    _voter_section.section_name_english,
+    _voter_section.start_serial_number,
+)
+
+# Columns selected for export rows, in CSV column order
+_EXPORT_COLUMNS = (
+    Voter.serial_number,
+    Voter.house_number,
+    Voter.voter_name_local,
+    Voter.voter_name_english,
+    Voter.relation_type,
+    Voter.relation_name_local,
+    Voter.relation_name_english,
+    Voter.gender,
+    Voter.age,
+    Voter.photo_id,
+    DocumentHeader.state,
+    DocumentHeader.assembly_constituency_name_english,
+    DocumentHeader.part_number,
+    DocumentHeader.polling_station_name_english,
+)
+_EXPORT_SECTION_COLUMNS = (_voter_section.section_id,)
+
+# Accepted sort_by values; without sort_by voters are ordered by serial number
+SORT_FIELDS: dict[str, InstrumentedAttribute] = {
+    "serial_number": Voter.serial_number,
+    "created_at": Voter.created_at,
+    "name": Voter.voter_name_english,
+    "father_name": Voter.relation_name_english,
+    "part_number": DocumentHeader.part_number,
+}
+
+# Columns matched (ILIKE '%term%') per search_type; any other search_type searches _ALL_SEARCH_FIELDS
+SEARCH_FIELDS: dict[str, tuple] = {
+    "name": (Voter.voter_name_english, Voter.voter_name_local),
+    "father_name": (Voter.relation_name_english, Voter.relation_name_local),
+    "epic": (Voter.photo_id,),
+    "house_no": (Voter.house_number,),
+}
+_ALL_SEARCH_FIELDS = (
+    Voter.voter_name_english,
+    Voter.voter_name_local,
+    Voter.relation_name_english,
+    Voter.relation_name_local,
+    Voter.house_number,
+    Voter.photo_id,
+    cast(Voter.serial_number, String),
+)
+
+
+def invalidate_voter_count_cache() -> None:
+    """Drop cached voter totals; call after voters are inserted or deleted."""
+    global _count_cache_version
+    _count_cache_version += 1
+    _count_cache.clear()
+
+
+def _parse_int(value: str | None) -> int | None:
+    """Parse a numeric query parameter; None when empty or not an integer."""
+    try:
+        return int(value) if value else None
+    except (ValueError, TypeError):
+        return None
+
 
 class VoterService:
-    """Service for voter operations."""
+    """
+    Service for voter operations.
     
-    def __init__(self, db: Session):
+    Runs on an AsyncSession (see app.db.get_async_db) so voter reads don't hold a
+    threadpool worker for the duration of their queries.
+    """
+    
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def _get_document_sections_cache(self, document_ids: list[int]) -> dict[int, list[DocumentSection]]:
-        """Load and cache document sections for given document IDs."""
-        if not document_ids:
-            return {}
-        
-        sections = (
-            self.db.query(DocumentSection)
-            .filter(DocumentSection.document_id.in_(document_ids))
-            .all()
-        )
-        
-        # Group by document_id
-        cache: dict[int, list[DocumentSection]] = {}
-        for section in sections:
-            if section.document_id not in cache:
-                cache[section.document_id] = []
-            cache[section.document_id].append(section)
-        
-        return cache
+    async def _cached_count(self, query: Select, filter_key: tuple) -> int:
+        """Return the row count of query, reusing a recent result for the same filters."""
+        key = hashlib.blake2b(
+            repr((_count_cache_version, filter_key)).encode("utf-8"), digest_size=16
+        ).hexdigest()
+        total = _count_cache.get(key)
+        if total is None:
+            total = await self.db.scalar(select(func.count()).select_from(query.subquery()))
+            _count_cache.set(key, total)
+        return total
+    
+    @staticmethod
+    def _encode_cursor(sort_value: Any, voter_id: int) -> str:
+        """Encode the last row's (sort value, voter id) pair as an opaque cursor."""
+        if isinstance(sort_value, datetime):
+            sort_value = sort_value.isoformat()
+        payload = json.dumps([sort_value, voter_id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
     
-    def _find_voter_section(
-        self, voter_serial: int | None, sections: list[DocumentSection]
-    ) -> DocumentSection | None:
+    @staticmethod
+    def _decode_cursor(cursor: str, order_column: InstrumentedAttribute) -> tuple[Any, int]:
         """
-        Find which section a voter belongs to based on serial_number.
+        Decode a cursor produced by _encode_cursor.
         
-        Returns the section where start_serial_number <= voter_serial < next_section.start_serial_number.
-        If no next section exists, returns the last section with start_serial_number <= voter_serial.
-        Returns None if no matching section found.
-        
-        This method correctly handles multiple occurrences of the same section_id at different
-        serial number ranges (e.g., section_one at 1-50 and again at 101-110) by sorting
-        sections by start_serial_number and finding the appropriate range.
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        if voter_serial is None or not sections:
-            return None
-        
-        # Filter and sort sections by start_serial_number (ascending), then by section_id for consistency
-        # This handles multiple occurrences of the same section_id correctly
-        sorted_sections = sorted(
-            [s for s in sections if s.start_serial_number is not None],
-            key=lambda s: (s.start_serial_number, s.section_id)
-        )
-        
-        if not sorted_sections:
-            return None
-        
-        # Find section where start_serial_number <= voter_serial < next_section.start_serial_number
-        for i, section in enumerate(sorted_sections):
-            if section.start_serial_number <= voter_serial:
-                # Check if there's a next section
-                if i + 1 < len(sorted_sections):
-                    next_start = sorted_sections[i + 1].start_serial_number
-                    if voter_serial < next_start:
-                        return section
-                else:
-                    # Last section, voter is in this section
-                    return section
+        try:
+            sort_value, voter_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            if sort_value is not None and isinstance(order_column.type, DateTime):
+                sort_value = datetime.fromisoformat(sort_value)
+        except (ValueError, TypeError) as e:
+            raise ValueError("Invalid pagination cursor") from e
+        if not isinstance(voter_id, int):
+            raise ValueError("Invalid pagination cursor")
+        return sort_value, voter_id
+    
+    @staticmethod
+    def _apply_cursor(
+        query: Select,
+        order_column: InstrumentedAttribute,
+        descending: bool,
+        last_sort: Any,
+        last_id: int,
+    ) -> Select:
+        """
+        Restrict query to rows after (last_sort, last_id) in the listing order.
         
-        return None
+        The listing orders by (order_column, Voter.id), ascending with NULLs last
+        or descending with NULLs first (PostgreSQL's defaults), so NULL sort values
+        need their own branch since row-value comparison with NULL is never true.
+        """
+        if not descending:
+            if last_sort is None:
+                return query.filter(order_column.is_(None), Voter.id > last_id)
+            return query.filter(
+                or_(tuple_(order_column, Voter.id) > (last_sort, last_id), order_column.is_(None))
+            )
+        if last_sort is None:
+            return query.filter(
+                or_(and_(order_column.is_(None), Voter.id < last_id), order_column.isnot(None))
+            )
+        return query.filter(tuple_(order_column, Voter.id) < (last_sort, last_id))
     
-    def list_voters(
+    def _build_filtered_query(
         self,
+        columns: tuple,
         state: str,
         assembly_constituency_number: str,
         search: Optional[str] = None,
@@ -90,32 +224,28 @@ class VoterService:
         part_number: Optional[str] = None,
         polling_station: Optional[str] = None,
         gender: Optional[str] = None,
-        sort_by: Optional[str] = None,
-        sort_order: str = "asc",
-        page: int = 1,
-        page_size: int = 50,
-    ) -> VoterListResponse:
-        """List voters with filtering and pagination."""
+    ) -> Select:
+        """
+        Build the filtered voter query shared by list_voters and export_voters_csv.
+        
+        Rows carry the given Voter/DocumentHeader columns; see _with_section for
+        adding section columns.
+        """
         # Join with document_header to filter by state and assembly_constituency_number
-        # Use case-insensitive comparison for state
+        # Use case-insensitive comparison for state (stored whitespace-normalized)
+        # Select the needed header columns alongside each voter so no per-row header lookup is needed
         query = (
-            self.db.query(Voter)
+            select(*columns)
             .join(DocumentHeader, Voter.document_id == DocumentHeader.document_id)
-            .filter(DocumentHeader.state.ilike(state))
+            .filter(func.lower(DocumentHeader.state) == DocumentHeader.normalize_state(state).lower())
         )
         
-        # Filter by assembly_constituency_number (check both local and english fields)
-        # Convert string to int for english field comparison
-        try:
-            ac_number_int = int(assembly_constituency_number) if assembly_constituency_number else None
-        except (ValueError, TypeError):
-            ac_number_int = None
+        # Filter by assembly_constituency_number
+        # Numeric input matches the generated ac_key column (english number, else numeric local)
+        ac_number_int = _parse_int(assembly_constituency_number)
         
         if ac_number_int is not None:
-            query = query.filter(
-                (DocumentHeader.assembly_constituency_number_english == ac_number_int)
-                | (DocumentHeader.assembly_constituency_number_local == assembly_constituency_number)
-            )
+            query = query.filter(DocumentHeader.ac_key == ac_number_int)
         else:
             # Fallback to string comparison for local field only
             query = query.filter(
@@ -123,121 +253,184 @@ class VoterService:
             )
         
         # Apply additional filters
+        # part_number and polling_station_number_english are Integer columns; asyncpg binds a
+        # str as VARCHAR (no implicit cast), so compare them only with numeric input
         if part_number:
-            query = query.filter(DocumentHeader.part_number == part_number)
+            part_number_int = _parse_int(part_number)
+            if part_number_int is None:
+                # No document has a non-numeric part number
+                query = query.filter(false())
+            else:
+                query = query.filter(DocumentHeader.part_number == part_number_int)
         
         if polling_station:
-            query = query.filter(
-                (DocumentHeader.polling_station_name_english.ilike(f"%{polling_station}%"))
-                | (DocumentHeader.polling_station_name_local.ilike(f"%{polling_station}%"))
-                | (DocumentHeader.polling_station_number_english == polling_station)
-                | (DocumentHeader.polling_station_number_local == polling_station)
-            )
+            polling_station_filters = [
+                DocumentHeader.polling_station_name_english.ilike(f"%{polling_station}%"),
+                DocumentHeader.polling_station_name_local.ilike(f"%{polling_station}%"),
+                DocumentHeader.polling_station_number_local == polling_station,
+            ]
+            polling_station_int = _parse_int(polling_station)
+            if polling_station_int is not None:
+                polling_station_filters.append(
+                    DocumentHeader.polling_station_number_english == polling_station_int
+                )
+            query = query.filter(or_(*polling_station_filters))
         
         if gender and gender.lower() != "all":
             query = query.filter(Voter.gender == gender)
         
         # Apply search if provided
+        # ILIKE '%term%' on these columns is served by the pg_trgm GIN indexes on voters
         if search and search.strip():
             search_term = f"%{search.strip()}%"
             
-            if search_type == "name":
-                query = query.filter(
-                    (Voter.voter_name_english.ilike(search_term))
-                    | (Voter.voter_name_local.ilike(search_term))
-                )
-            elif search_type == "father_name":
-                query = query.filter(
-                    (Voter.relation_name_english.ilike(search_term))
-                    | (Voter.relation_name_local.ilike(search_term))
-                )
-            elif search_type == "epic":
-                query = query.filter(Voter.photo_id.ilike(search_term))
-            elif search_type == "house_no":
-                query = query.filter(Voter.house_number.ilike(search_term))
-            else:
-                # Default: search across all fields
-                query = query.filter(
-                    (Voter.voter_name_english.ilike(search_term))
-                    | (Voter.voter_name_local.ilike(search_term))
-                    | (Voter.relation_name_english.ilike(search_term))
-                    | (Voter.relation_name_local.ilike(search_term))
-                    | (Voter.house_number.ilike(search_term))
-                    | (Voter.photo_id.ilike(search_term))
-                    | (Voter.serial_number.ilike(search_term))
-                )
+            search_columns = SEARCH_FIELDS.get(search_type, _ALL_SEARCH_FIELDS)
+            query = query.filter(or_(*(column.ilike(search_term) for column in search_columns)))
         
-        # Get total count before pagination
-        total = query.count()
+        return query
+    
+    @staticmethod
+    def _with_section(query: Select, columns: tuple) -> Select:
+        """Add the given columns of each voter's document section (NULL when it has none)."""
+        return query.add_columns(*columns).outerjoin(_voter_section, true())
+    
+    @staticmethod
+    def _order_by(sort_by: Optional[str], sort_order: str) -> tuple[InstrumentedAttribute, bool, tuple]:
+        """
+        Resolve sort parameters to (order column, descending, ORDER BY clauses).
         
-        # Apply sorting
-        if sort_by == "created_at":
-            order_field = Voter.created_at
-        elif sort_by == "name":
-            order_field = Voter.voter_name_english
-        elif sort_by == "father_name":
-            order_field = Voter.relation_name_english
-        elif sort_by == "part_number":
-            order_field = DocumentHeader.part_number
+        Voter.id breaks ties so the ordering is total and keyset pages are stable.
+        
+        Raises:
+            ValueError: If sort_by is not one of SORT_FIELDS
+        """
+        if sort_by and sort_by not in SORT_FIELDS:
+            raise ValueError(
+                f"Invalid sort_by '{sort_by}'; expected one of: {', '.join(SORT_FIELDS)}"
+            )
+        order_column = SORT_FIELDS[sort_by or "serial_number"]
+        
+        descending = sort_order == "desc"
+        if descending:
+            order_by = (order_column.desc().nulls_first(), Voter.id.desc())
         else:
-            order_field = Voter.serial_number  # default
+            order_by = (order_column.asc().nulls_last(), Voter.id.asc())
+        return order_column, descending, order_by
+    
+    async def list_voters(
+        self,
+        state: str,
+        assembly_constituency_number: str,
+        search: Optional[str] = None,
+        search_type: Optional[str] = None,
+        part_number: Optional[str] = None,
+        polling_station: Optional[str] = None,
+        gender: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        sort_order: str = "asc",
+        page: int = 1,
+        page_size: int = 50,
+        cursor: Optional[str] = None,
+    ) -> VoterListResponse:
+        """
+        List voters with filtering and pagination.
+        
+        Pages by offset (``page``) unless ``cursor`` is given, in which case rows are
+        fetched with a keyset seek after the cursor position and ``total`` is not
+        computed. Every response carries a ``next_cursor`` for the following page.
         
-        if sort_order == "desc":
-            order_field = order_field.desc()
+        Raises:
+            ValueError: If the cursor is malformed or sort_by is unknown
+        """
+        query = self._build_filtered_query(
+            _LIST_COLUMNS,
+            state=state,
+            assembly_constituency_number=assembly_constituency_number,
+            search=search,
+            search_type=search_type,
+            part_number=part_number,
+            polling_station=polling_station,
+            gender=gender,
+        )
+        order_column, descending, order_by = self._order_by(sort_by, sort_order)
         
         # Apply pagination
-        offset = (page - 1) * page_size
-        voters = query.order_by(order_field).offset(offset).limit(page_size).all()
+        total: int | None = None
+        if cursor:
+            last_sort, last_id = self._decode_cursor(cursor, order_column)
+            query = self._apply_cursor(query, order_column, descending, last_sort, last_id)
+            result = await self.db.execute(
+                self._with_section(query, _LIST_SECTION_COLUMNS)
+                .order_by(*order_by)
+                .limit(page_size)
+            )
+        else:
+            # Get total count before pagination
+            total = await self._cached_count(
+                query.with_only_columns(Voter.id),
+                (
+                    DocumentHeader.normalize_state(state).lower(),
+                    assembly_constituency_number,
+                    part_number,
+                    polling_station,
+                    gender,
+                    search.strip() if search else None,
+                    search_type,
+                ),
+            )
+            offset = (page - 1) * page_size
+            result = await self.db.execute(
+                self._with_section(query, _LIST_SECTION_COLUMNS)
+                .order_by(*order_by)
+                .offset(offset)
+                .limit(page_size)
+            )
+        
+        rows = result.all()
         
-        # Load document sections cache for all unique document_ids
-        unique_document_ids = list(set(voter.document_id for voter in voters))
-        sections_cache = self._get_document_sections_cache(unique_document_ids)
+        next_cursor = None
+        if rows and len(rows) == page_size:
+            # Every sortable column is selected under its own key
+            last_row = rows[-1]
+            next_cursor = self._encode_cursor(getattr(last_row, order_column.key), last_row.id)
         
-        # Map to VoterRead with header context and document section
+        # Map to VoterRead with header context and document section; rows come
+        # straight from typed columns, so construct without re-validating
+        # Voters on a page mostly share a handful of sections, so build each section once
         items = []
-        for voter in voters:
-            header = self.db.get(DocumentHeader, voter.document_id)
-            
-            # Calculate document_section
+        section_reads: dict[int, DocumentSectionRead] = {}
+        for row in rows:
             document_section = None
-            sections = sections_cache.get(voter.document_id, [])
-            if sections:
-                found_section = self._find_voter_section(voter.serial_number, sections)
-                if found_section:
-                    document_section = DocumentSectionRead.model_validate(found_section)
+            if row.document_section_id is not None:
+                document_section = section_reads.get(row.document_section_id)
+                if document_section is None:
+                    document_section = DocumentSectionRead.model_construct(
+                        id=row.document_section_id,
+                        document_id=row.document_id,
+                        section_id=row.section_id,
+                        section_name_local=row.section_name_local,
+                        section_name_english=row.section_name_english,
+                        start_serial_number=row.start_serial_number,
+                    )
+                    section_reads[row.document_section_id] = document_section
             
-            voter_read = VoterRead(
-                id=voter.id,
-                document_id=voter.document_id,
-                serial_number=voter.serial_number,
-                house_number=voter.house_number,
-                voter_name_local=voter.voter_name_local,
-                voter_name_english=voter.voter_name_english,
-                relation_type=voter.relation_type,
-                relation_name_local=voter.relation_name_local,
-                relation_name_english=voter.relation_name_english,
-                gender=voter.gender,
-                age=voter.age,
-                photo_id=voter.photo_id,
-                state=header.state if header else None,
-                assembly_constituency_number_english=(
-                    header.assembly_constituency_number_english if header else None
-                ),
-                assembly_constituency_name_english=(
-                    header.assembly_constituency_name_english if header else None
-                ),
-                part_number=header.part_number if header else None,
-                document_section=document_section,
-                created_at=voter.created_at,
-                updated_at=voter.updated_at,
-            )
+            voter_read = VoterRead.model_construct(**row._mapping, document_section=document_section)
             items.append(voter_read)
         
         logger.info(
-            f"Voters list: page={page}, page_size={page_size}, "
-            f"state={state}, assembly_constituency_number={assembly_constituency_number}, "
-            f"gender={gender}, search={search}, search_type={search_type}, "
-            f"total={total}, returned={len(items)}"
+            "Voters list: page=%s, page_size=%s, "
+            "state=%s, assembly_constituency_number=%s, "
+            "gender=%s, search=%s, search_type=%s, "
+            "total=%s, returned=%s",
+            page,
+            page_size,
+            state,
+            assembly_constituency_number,
+            gender,
+            search,
+            search_type,
+            total,
+            len(items),
         )
         
         return VoterListResponse(
@@ -245,9 +438,10 @@ class VoterService:
             total=total,
             page=page,
             page_size=page_size,
+            next_cursor=next_cursor,
         )
     
-    def export_voters_csv(
+    async def export_voters_csv(
         self,
         state: str,
         assembly_constituency_number: str,
@@ -258,149 +452,69 @@ class VoterService:
         gender: Optional[str] = None,
         sort_by: Optional[str] = None,
         sort_order: str = "asc",
-    ) -> tuple[io.BytesIO, str]:
-        """Export voters to CSV format."""
-        # Build the same query as list_voters but without pagination
-        # Use case-insensitive comparison for state
-        query = (
-            self.db.query(Voter)
-            .join(DocumentHeader, Voter.document_id == DocumentHeader.document_id)
-            .filter(DocumentHeader.state.ilike(state))
-        )
-        
-        # Filter by assembly_constituency_number
-        # Convert string to int for english field comparison
-        try:
-            ac_number_int = int(assembly_constituency_number) if assembly_constituency_number else None
-        except (ValueError, TypeError):
-            ac_number_int = None
-        
-        if ac_number_int is not None:
-            query = query.filter(
-                (DocumentHeader.assembly_constituency_number_english == ac_number_int)
-                | (DocumentHeader.assembly_constituency_number_local == assembly_constituency_number)
-            )
-        else:
-            # Fallback to string comparison for local field only
-            query = query.filter(
-                DocumentHeader.assembly_constituency_number_local == assembly_constituency_number
-            )
-        
-        # Apply additional filters
-        if part_number:
-            query = query.filter(DocumentHeader.part_number == part_number)
-        
-        if polling_station:
-            query = query.filter(
-                (DocumentHeader.polling_station_name_english.ilike(f"%{polling_station}%"))
-                | (DocumentHeader.polling_station_name_local.ilike(f"%{polling_station}%"))
-                | (DocumentHeader.polling_station_number_english == polling_station)
-                | (DocumentHeader.polling_station_number_local == polling_station)
-            )
-        
-        if gender and gender.lower() != "all":
-            query = query.filter(Voter.gender == gender)
-        
-        # Apply search if provided
-        if search and search.strip():
-            search_term = f"%{search.strip()}%"
-            
-            if search_type == "name":
-                query = query.filter(
-                    (Voter.voter_name_english.ilike(search_term))
-                    | (Voter.voter_name_local.ilike(search_term))
-                )
-            elif search_type == "father_name":
-                query = query.filter(
-                    (Voter.relation_name_english.ilike(search_term))
-                    | (Voter.relation_name_local.ilike(search_term))
-                )
-            elif search_type == "epic":
-                query = query.filter(Voter.photo_id.ilike(search_term))
-            elif search_type == "house_no":
-                query = query.filter(Voter.house_number.ilike(search_term))
-            else:
-                # Default: search across all fields
-                query = query.filter(
-                    (Voter.voter_name_english.ilike(search_term))
-                    | (Voter.voter_name_local.ilike(search_term))
-                    | (Voter.relation_name_english.ilike(search_term))
-                    | (Voter.relation_name_local.ilike(search_term))
-                    | (Voter.house_number.ilike(search_term))
-                    | (Voter.photo_id.ilike(search_term))
-                    | (Voter.serial_number.ilike(search_term))
-                )
+    ) -> tuple[AsyncIterator[bytes], str]:
+        """
+        Export voters to CSV format.
         
-        # Apply sorting
-        if sort_by == "created_at":
-            order_field = Voter.created_at
-        elif sort_by == "name":
-            order_field = Voter.voter_name_english
-        elif sort_by == "father_name":
-            order_field = Voter.relation_name_english
-        elif sort_by == "part_number":
-            order_field = DocumentHeader.part_number
-        else:
-            order_field = Voter.serial_number  # default
+        The query is executed up front (so errors surface before a response starts),
+        but rows are streamed from a server-side cursor in batches of
+        _EXPORT_BATCH_SIZE and encoded one batch at a time. The returned iterator
+        must be consumed or closed while this service's session is still open.
         
-        if sort_order == "desc":
-            order_field = order_field.desc()
+        Raises:
+            ValueError: If sort_by is unknown
+        """
+        query = self._build_filtered_query(
+            _EXPORT_COLUMNS,
+            state=state,
+            assembly_constituency_number=assembly_constituency_number,
+            search=search,
+            search_type=search_type,
+            part_number=part_number,
+            polling_station=polling_station,
+            gender=gender,
+        )
+        _, _, order_by = self._order_by(sort_by, sort_order)
         
         # Get all voters (no pagination for export)
-        voters = query.order_by(order_field).all()
+        result = await self.db.stream(
+            self._with_section(query, _EXPORT_SECTION_COLUMNS).order_by(*order_by),
+            execution_options={"yield_per": _EXPORT_BATCH_SIZE},
+        )
         
-        # Load document sections cache for all unique document_ids
-        unique_document_ids = list(set(voter.document_id for voter in voters))
-        sections_cache = self._get_document_sections_cache(unique_document_ids)
+        # Create filename
+        filename = f"voters_{state}_{assembly_constituency_number}.csv"
         
-        # Create CSV content
+        return self._iter_csv(result), filename
+    
+    @staticmethod
+    async def _iter_csv(result: AsyncResult) -> AsyncIterator[bytes]:
+        """Encode export rows as CSV, yielding one chunk of bytes per fetched batch."""
         output = io.StringIO()
         writer = csv.writer(output)
         
-        # Write header
-        writer.writerow([
-            'Serial Number', 'House Number', 'Voter Name (Local)', 'Voter Name (English)',
-            'Relation Type', 'Relation Name (Local)', 'Relation Name (English)',
-            'Gender', 'Age', 'Photo ID', 'State', 'Assembly Constituency',
-            'Part Number', 'Polling Station', 'Section ID'
-        ])
-        
-        # Write data
-        for voter in voters:
-            header = self.db.get(DocumentHeader, voter.document_id)
-            
-            # Calculate section_id
-            section_id = ''
-            sections = sections_cache.get(voter.document_id, [])
-            if sections:
-                found_section = self._find_voter_section(voter.serial_number, sections)
-                if found_section:
-                    section_id = str(found_section.section_id)
-            
+        try:
+            # Write header
             writer.writerow([
-                voter.serial_number or '',
-                voter.house_number or '',
-                voter.voter_name_local or '',
-                voter.voter_name_english or '',
-                voter.relation_type or '',
-                voter.relation_name_local or '',
-                voter.relation_name_english or '',
-                voter.gender or '',
-                voter.age or '',
-                voter.photo_id or '',
-                header.state if header else '',
-                header.assembly_constituency_name_english if header else '',
-                header.part_number if header else '',
-                header.polling_station_name_english if header else '',
-                section_id,
+                'Serial Number', 'House Number', 'Voter Name (Local)', 'Voter Name (English)',
+                'Relation Type', 'Relation Name (Local)', 'Relation Name (English)',
+                'Gender', 'Age', 'Photo ID', 'State', 'Assembly Constituency',
+                'Part Number', 'Polling Station', 'Section ID'
             ])
-        
-        output.seek(0)
-        
-        # Create filename
-        filename = f"voters_{state}_{assembly_constituency_number}.csv"
-        
-        # Return as BytesIO
-        csv_bytes = io.BytesIO(output.getvalue().encode('utf-8'))
-        
-        return csv_bytes, filename
+            
+            # Write data
+            async for batch in result.partitions():
+                # writerows drives the loop in C; rows are already in CSV column order
+                writer.writerows(
+                    tuple(value or '' for value in row) for row in batch
+                )
+                
+                yield output.getvalue().encode('utf-8')
+                output.seek(0)
+                output.truncate(0)
+            
+            # Header only when there are no rows
+            if output.tell():
+                yield output.getvalue().encode('utf-8')
+        finally:
+            await result.close()
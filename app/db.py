@@ -1,18 +1,82 @@
+import logging
 from contextlib import contextmanager
-from typing import Iterator
+from typing import AsyncIterator, Iterator
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import URL, create_engine, event, make_url, text
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from .config import get_settings
 
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
-engine = create_engine(settings.database_url, future=True, echo=False)
+# pool_pre_ping tests each connection on checkout so a DB restart or failover doesn't
+# surface as errors on the first requests afterwards. query_cache_size is raised so the many filter
+# shapes of the voter queries stay in the compiled-statement cache.
+engine = create_engine(
+    settings.database_url,
+    future=True,
+    echo=False,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    pool_recycle=settings.db_pool_recycle_seconds,
+    query_cache_size=2000,
+    executemany_mode="values_plus_batch",
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+# Sessions handed to request handlers by get_db. statement_timeout is set per transaction
+# here rather than on the engine, so extraction merges and other background work on
+# SessionLocal are not cut off by a limit meant for API requests.
+RequestSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+
+@event.listens_for(RequestSessionLocal, "after_begin")
+def _set_request_statement_timeout(session: Session, transaction, connection) -> None:
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {settings.db_statement_timeout_ms}")
+
+
+def _async_database_url() -> tuple[URL, dict]:
+    """
+    Derive the asyncpg URL and connect args from DATABASE_URL.
+
+    DATABASE_URL is written for psycopg2, and asyncpg rejects libpq query parameters
+    such as sslmode, so the query is dropped (except a socket ``host``) and sslmode is
+    passed as asyncpg's ``ssl`` connect argument instead.
+    """
+    url = make_url(settings.database_url)
+    query = {"host": url.query["host"]} if "host" in url.query else {}
+    connect_args: dict = {}
+    if "sslmode" in url.query:
+        connect_args["ssl"] = url.query["sslmode"]
+    return url.set(drivername="postgresql+asyncpg", query=query), connect_args
+
+
+_async_url, _async_connect_args = _async_database_url()
+
+# Async engine (asyncpg) for request handlers that run directly on the event loop.
+# Extraction, migrations and the remaining services keep using the sync engine above.
+# It only serves the voter list/export, so it has its own, smaller pool, and the request
+# statement_timeout can be set on its connections directly.
+async_engine = create_async_engine(
+    _async_url,
+    echo=False,
+    pool_size=settings.db_async_pool_size,
+    max_overflow=settings.db_async_max_overflow,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    pool_recycle=settings.db_pool_recycle_seconds,
+    query_cache_size=2000,
+    connect_args={
+        **_async_connect_args,
+        "server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)},
+    },
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -35,6 +99,18 @@ def check_database_connection() -> None:
         ) from e
 
 
+async def warm_async_connection_pool() -> None:
+    """
+    Open one pooled async connection and ping it, so the first voter request doesn't
+    pay for connecting. The rest of the pool fills on demand.
+    """
+    try:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as e:
+        logger.warning("Async connection pool warm-up ping failed: %s", e)
+
+
 @contextmanager
 def session_scope() -> Iterator[Session]:
     """Provide a transactional scope around a series of operations."""
@@ -51,10 +127,16 @@ def session_scope() -> Iterator[Session]:
 
 def get_db() -> Iterator[Session]:
     """FastAPI dependency that yields a DB session."""
-    db: Session = SessionLocal()
+    db: Session = RequestSessionLocal()
     try:
         yield db
     finally:
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency that yields an async DB session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
@@ -1,3 +1,4 @@
+import logging
 import os
 import sys
 import time
@@ -10,7 +11,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
 from app.config import get_settings
 from app.core.logging_config import setup_logging, get_logger
-from app.db import check_database_connection
+from app.db import (
+    async_engine,
+    check_database_connection,
+    warm_async_connection_pool,
+)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -56,32 +61,47 @@ app.add_middleware(
 )
 
 
+# Probe endpoints hit by load balancers/k8s at high frequency; not worth logging or timing
+_UNLOGGED_PATHS = frozenset({"/health", "/"})
+
+
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next: Callable) -> Response:
     """Log all incoming HTTP requests with timing information."""
-    start_time = time.time()
+    if request.url.path in _UNLOGGED_PATHS:
+        return await call_next(request)
+    
+    start_ns = time.perf_counter_ns()
+    log_enabled = logger.isEnabledFor(logging.INFO)
     
     # Log request
-    logger.info(
-        f"Request: {request.method} {request.url.path} "
-        f"| Client: {request.client.host if request.client else 'unknown'}"
-    )
+    if log_enabled:
+        logger.info(
+            "Request: %s %s | Client: %s",
+            request.method,
+            request.url.path,
+            request.client.host if request.client else "unknown",
+        )
     
     # Process request
     response = await call_next(request)
     
-    # Calculate processing time
-    process_time = time.time() - start_time
+    # Calculate processing time (monotonic, unaffected by wall-clock adjustments)
+    elapsed_ns = time.perf_counter_ns() - start_ns
     
     # Log response
-    logger.info(
-        f"Response: {request.method} {request.url.path} "
-        f"| Status: {response.status_code} | Time: {process_time:.3f}s"
-    )
+    if log_enabled:
+        logger.info(
+            "Response: %s %s | Status: %s | Time: %.3fs",
+            request.method,
+            request.url.path,
+            response.status_code,
+            elapsed_ns / 1e9,
+        )
     
-    # Add timing header
-    response.headers["X-Process-Time"] = str(process_time)
+    # Add timing header (seconds, as before)
+    response.headers["X-Process-Time"] = str(elapsed_ns / 1e9)
     
     return response
 
@@ -95,6 +115,7 @@ def on_startup() -> None:
     # Check database connection - this will raise an exception and fail startup if DB is not available
     logger.info("Checking database connection...")
     try:
+        # Also leaves that connection in the pool for the first request
         check_database_connection()
         logger.info("Database connection verified successfully")
     except ConnectionError as e:
@@ -112,6 +133,18 @@ def on_startup() -> None:
     logger.info("FastAPI application started successfully")
 
 
+@app.on_event("startup")
+async def warm_async_pool() -> None:
+    """Open one async DB connection before the first voter request."""
+    await warm_async_connection_pool()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine() -> None:
+    """Close pooled async DB connections."""
+    await async_engine.dispose()
+
+
 @app.get("/health")
 def health_check() -> dict:
     """Health check endpoint."""
@@ -2,16 +2,22 @@ import enum
 from datetime import datetime
 
 from sqlalchemy import (
-    JSON,
     Boolean,
+    Computed,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
+    cast,
+    column,
+    func,
+    text,
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from app.db import Base
 
@@ -39,20 +45,21 @@ class SegmentStatus(str, enum.Enum):
 
 
 class TimestampMixin:
+    # Set by the database (timezone-aware now()); updates render now() into the UPDATE
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow
+        DateTime(timezone=True), server_default=func.now()
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        server_default=func.now(),
+        onupdate=func.now(),
     )
 
 
 class Document(Base, TimestampMixin):
     __tablename__ = "documents"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     original_filename: Mapped[str] = mapped_column(String(length=512))
     upload_file_uri: Mapped[str | None] = mapped_column(String(length=1024), nullable=True)
     mime_type: Mapped[str | None] = mapped_column(String(length=255), nullable=True)
@@ -76,7 +83,7 @@ class Document(Base, TimestampMixin):
 class ExtractionRun(Base, TimestampMixin):
     __tablename__ = "extraction_runs"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     document_id: Mapped[int] = mapped_column(ForeignKey("documents.id"), nullable=False)
     status: Mapped[ExtractionRunStatus] = mapped_column(
         Enum(ExtractionRunStatus),
@@ -96,7 +103,7 @@ class ExtractionRun(Base, TimestampMixin):
 class ExtractionSegment(Base, TimestampMixin):
     __tablename__ = "extraction_segments"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     extraction_run_id: Mapped[int] = mapped_column(
         ForeignKey("extraction_runs.id"), nullable=False
     )
@@ -106,15 +113,19 @@ class ExtractionSegment(Base, TimestampMixin):
     status: Mapped[SegmentStatus] = mapped_column(
         Enum(SegmentStatus), default=SegmentStatus.PENDING, nullable=False
     )
-    raw_response_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
-    parsed_header_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
-    parsed_list_json: Mapped[list[dict] | None] = mapped_column(JSON, nullable=True)
+    raw_response_json: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    parsed_header_json: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    parsed_list_json: Mapped[list[dict] | None] = mapped_column(JSONB, nullable=True)
 
     extraction_run: Mapped[ExtractionRun] = relationship(back_populates="segments")
 
 
 class DocumentHeader(Base, TimestampMixin):
     __tablename__ = "document_header"
+    __table_args__ = (
+        # Voter list filter: lower(state) = ? AND ac_key = ?
+        Index("ix_document_header_state_ac_key", func.lower(text("state")), "ac_key"),
+    )
 
     document_id: Mapped[int] = mapped_column(
         ForeignKey("documents.id"), primary_key=True
@@ -152,18 +163,64 @@ class DocumentHeader(Base, TimestampMixin):
     polling_station_building_and_address_english: Mapped[str | None] = mapped_column(
         String(length=1024)
     )
-    raw_header_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    raw_header_json: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    # Constituency number as an integer: english number, else the local value if it is plain digits
+    ac_key: Mapped[int | None] = mapped_column(
+        Integer,
+        Computed(
+            r"COALESCE(assembly_constituency_number_english, "
+            r"substring(assembly_constituency_number_local from '^\s*0*([0-9]{1,9})\s*$')::integer)",
+            persisted=True,
+        ),
+        nullable=True,
+    )
 
     document: Mapped[Document] = relationship(back_populates="header")
 
+    @staticmethod
+    def normalize_state(value: str | None) -> str | None:
+        """Trim and collapse whitespace so one state is always stored and matched the same way."""
+        if value is None:
+            return None
+        return " ".join(value.split())
+
+    @validates("state")
+    def _validate_state(self, key: str, value: str | None) -> str | None:
+        return self.normalize_state(value)
+
 
 class Voter(Base, TimestampMixin):
     __tablename__ = "voters"
     __table_args__ = (
+        # Also serves (document_id, serial_number) lookups and ordering; no separate index needed
         UniqueConstraint("document_id", "serial_number", name="uq_voter_doc_serial"),
+        # pg_trgm GIN indexes so the voter search's ILIKE '%term%' can use an index
+        *(
+            Index(
+                f"ix_voters_{name}_trgm",
+                name,
+                postgresql_using="gin",
+                postgresql_ops={name: "gin_trgm_ops"},
+            )
+            for name in (
+                "voter_name_english",
+                "voter_name_local",
+                "relation_name_english",
+                "relation_name_local",
+                "house_number",
+                "photo_id",
+            )
+        ),
+        # Must match CAST(voters.serial_number AS VARCHAR) emitted by the default search
+        Index(
+            "ix_voters_serial_number_trgm",
+            cast(column("serial_number"), String).label("serial_number_text"),
+            postgresql_using="gin",
+            postgresql_ops={"serial_number_text": "gin_trgm_ops"},
+        ),
     )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     document_id: Mapped[int] = mapped_column(ForeignKey("documents.id"), nullable=False)
     serial_number: Mapped[int | None] = mapped_column(Integer, nullable=True)
     house_number: Mapped[str | None] = mapped_column(String(length=255))
@@ -175,7 +232,7 @@ class Voter(Base, TimestampMixin):
     gender: Mapped[str | None] = mapped_column(String(length=20))
     age: Mapped[int | None] = mapped_column(Integer, nullable=True)
     photo_id: Mapped[str | None] = mapped_column(String(length=255))
-    raw_row_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    raw_row_json: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
 
     document: Mapped[Document] = relationship(back_populates="voters")
 
@@ -184,16 +241,29 @@ class DocumentSection(Base, TimestampMixin):
     __tablename__ = "document_sections"
     __table_args__ = (
         UniqueConstraint("document_id", "section_id", "start_serial_number", name="uq_document_section_occurrence"),
+        # NULLs are distinct in the constraint above, so allow one NULL start per section here
+        Index(
+            "uq_document_section_null_start_serial",
+            "document_id",
+            "section_id",
+            unique=True,
+            postgresql_where=text("start_serial_number IS NULL"),
+        ),
+        # Voter -> section lookup: greatest start_serial_number <= serial, ties to higher section_id
+        Index(
+            "ix_document_sections_doc_start_desc",
+            "document_id",
+            text("start_serial_number DESC"),
+            text("section_id DESC"),
+        ),
     )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     document_id: Mapped[int] = mapped_column(ForeignKey("documents.id"), nullable=False)
     section_id: Mapped[int] = mapped_column(Integer, nullable=False)
     section_name_local: Mapped[str | None] = mapped_column(String(length=255), nullable=True)
     section_name_english: Mapped[str | None] = mapped_column(String(length=255), nullable=True)
     start_serial_number: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    # Note: Composite index on (document_id, start_serial_number) is created in migration
-    # Partial unique index for NULL handling is also created in migration
 
     document: Mapped[Document] = relationship(back_populates="sections")
 
@@ -210,7 +280,7 @@ class ApiKeySettings(Base, TimestampMixin):
         UniqueConstraint("provider_type", name="uq_api_key_provider"),
     )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     provider_type: Mapped[ApiKeyProvider] = mapped_column(
         Enum(ApiKeyProvider), nullable=False, unique=True
     )
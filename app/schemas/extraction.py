@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from app.models.core import ExtractionRunStatus, SegmentStatus, SegmentType
 
@@ -14,8 +14,7 @@ class ExtractionSegmentRead(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ExtractionRunRead(BaseModel):
@@ -27,8 +26,7 @@ class ExtractionRunRead(BaseModel):
     error_message: str | None
     segments: list[ExtractionSegmentRead]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ExtractionRunListResponse(BaseModel):
@@ -39,8 +37,7 @@ class ExtractionRunListResponse(BaseModel):
     page: int
     page_size: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class MetricsSummary(BaseModel):
@@ -59,8 +56,7 @@ class MetricsSummary(BaseModel):
     avg_extraction_time_seconds: float | None  # Average time for completed runs
     total_extraction_time_seconds: float | None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SegmentRetryResponse(BaseModel):
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.core import ApiKeyProvider
 
@@ -32,8 +32,7 @@ class ApiKeySettingsRead(ApiKeySettingsBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ApiKeySettingsResponse(BaseModel):
@@ -47,6 +46,5 @@ class ApiKeySettingsResponse(BaseModel):
     masked_key: Optional[str] = Field(None, description="Masked API key (first 7 chars + asterisks) for display only")
     key_generation_url: Optional[str] = Field(None, description="URL to generate API key for this provider")
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from app.schemas.documents import DocumentSectionRead
 
@@ -30,18 +30,17 @@ class VoterRead(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class VoterListResponse(BaseModel):
     """Response for GET /voters list endpoint."""
 
     items: list[VoterRead]
-    total: int
+    total: int | None  # None when paging by cursor
     page: int
     page_size: int
+    next_cursor: str | None = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
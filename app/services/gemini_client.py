@@ -1,15 +1,21 @@
 from __future__ import annotations
 
-import json
+import io
 import logging
+import threading
 import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Tuple
 
+import fastjsonschema
+import orjson
 from google import genai
 
 from app.config import get_settings
+from app.core.encryption import decrypt_api_key
 from app.core.settings_service import SettingsService
+from app.core.ttl_cache import TTLCache
 from app.models.core import ApiKeyProvider
 from app.db import SessionLocal
 
@@ -27,6 +33,54 @@ def _load_blueprint_prompt() -> str:
 
 
 BLUEPRINT_PROMPT = _load_blueprint_prompt()
+# Everything before the per-segment instruction, built once
+_PROMPT_PREFIX = f"{BLUEPRINT_PROMPT}\n\nSEGMENT INSTRUCTION:\n"
+_SEGMENT_HEADING = "SEGMENT INSTRUCTION:\n"
+
+# Response attributes logged when Gemini returns no text
+_EMPTY_RESPONSE_ATTRS = ("prompt_feedback", "candidates", "usage_metadata")
+
+# Shape of one "list" item in the blueprint (see valid_list_items). Deliberately loose
+# about scalar types (the merge coerces serial_number/age and stringifies the rest) but
+# rejects rows the merge can't handle, e.g. a non-object row or a voter_name that isn't
+# an object.
+_SCALAR = {"type": ["string", "number", "null"]}
+_NAME = {"type": ["object", "null"], "properties": {"local": _SCALAR, "english": _SCALAR}}
+VOTER_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "serial_number": _SCALAR,
+        "house_number": _SCALAR,
+        "voter_name": _NAME,
+        "relation_type": _SCALAR,
+        "relation_name": _NAME,
+        "gender": _SCALAR,
+        "age": _SCALAR,
+        "photo_id": _SCALAR,
+    },
+}
+# Compiled once into a plain Python function
+_validate_list_item = fastjsonschema.compile(VOTER_ITEM_SCHEMA)
+
+# The resolved (key token, client), so segments don't each read api_key_settings.
+# SettingsService writes call invalidate_gemini_client() in this process; the short TTL
+# bounds how long other worker processes keep using a rotated or deleted key.
+_CLIENT_CACHE_KEY = "gemini"
+_client_cache = TTLCache(maxsize=1, ttl_seconds=60)
+_client_lock = threading.Lock()
+
+# Gemini context cache per uploaded file_uri, holding the file plus BLUEPRINT_PROMPT so
+# segments of a document send only their instruction. Values are (api key token, model,
+# cache name). Entries expire well before the server-side TTL, so an expired cache is never
+# referenced; release_context_cache deletes a file's cache once its run is done.
+_context_cache = TTLCache(
+    maxsize=256, ttl_seconds=settings.gemini_context_cache_ttl_seconds * 0.9
+)
+# Files whose cache creation just failed; retried after a minute rather than on every segment
+_context_cache_failures = TTLCache(maxsize=256, ttl_seconds=60)
+# One lock per file_uri, so creating one document's cache doesn't block other documents
+_context_cache_locks: dict[str, threading.Lock] = {}
+_context_cache_locks_guard = threading.Lock()
 
 
 def get_gemini_client() -> genai.Client:
@@ -34,26 +88,64 @@ def get_gemini_client() -> genai.Client:
     Get Gemini client with API key from database or environment variable.
     
     Priority:
-    1. Database API key (if configured and active)
+    1. Database API key (active, or any stored key as fallback)
     2. Environment variable (backward compatibility)
     3. Raise error if neither exists
+    
+    The client is cached (see _client_cache), so segments of a document don't each
+    re-read and decrypt the key.
     """
-    api_key = None
+    return _resolve_gemini_client()[1]
+
+
+def invalidate_gemini_client() -> None:
+    """Drop the cached client; call after the stored Gemini API key changes."""
+    _client_cache.pop(_CLIENT_CACHE_KEY)
+
+
+def _resolve_gemini_client() -> Tuple[str, genai.Client]:
+    """Return (token identifying the key in use, client for that key)."""
+    entry = _client_cache.get(_CLIENT_CACHE_KEY)
+    if entry is not None:
+        return entry
     
-    # Try database first
+    with _client_lock:
+        entry = _client_cache.get(_CLIENT_CACHE_KEY)
+        if entry is None:
+            token, client, cacheable = _create_gemini_client()
+            entry = (token, client)
+            if cacheable:
+                _client_cache.set(_CLIENT_CACHE_KEY, entry)
+    return entry
+
+
+def _create_gemini_client() -> Tuple[str, genai.Client, bool]:
+    """
+    Resolve the API key and build a client.
+    
+    Returns (token, client, cacheable). The token identifies the key the client uses
+    (context caches are recorded against it); a client built after the database lookup
+    failed is not cacheable, so the next call retries the database.
+    """
+    encrypted_key = None
+    cacheable = True
     try:
         db = SessionLocal()
         try:
-            service = SettingsService(db)
-            # Try active key first
-            api_key = service.get_active_api_key(ApiKeyProvider.GEMINI)
-            # If no active key, try any key as fallback
-            if not api_key:
-                api_key = service.get_any_api_key(ApiKeyProvider.GEMINI)
+            # One stored key per provider; the active and "any key" lookups both return it
+            encrypted_key = SettingsService(db).get_encrypted_api_key(ApiKeyProvider.GEMINI)
         finally:
             db.close()
     except Exception as e:
-        logger.warning(f"Failed to get API key from database: {str(e)}")
+        logger.warning("Failed to get API key from database: %s", e)
+        cacheable = False
+    
+    api_key = None
+    if encrypted_key:
+        try:
+            api_key = decrypt_api_key(encrypted_key)
+        except Exception as e:
+            logger.error("Failed to decrypt Gemini API key: %s", e, exc_info=True)
     
     # Fall back to environment variable
     if not api_key:
@@ -72,7 +164,110 @@ def get_gemini_client() -> genai.Client:
         api_key=api_key,
         http_options=types.HttpOptions(timeout=settings.gemini_http_timeout_ms),
     )
-    return client
+    token = f"db:{encrypted_key}" if encrypted_key else "env"
+    return token, client, cacheable
+
+
+def _get_context_cache(
+    client: genai.Client, key_token: str, file_uri: str, mime_type: str
+) -> str | None:
+    """
+    Return the name of the context cache for an uploaded file, creating it on first use.
+
+    Returns None when caching is disabled or the cache could not be created (e.g. the
+    content is below the model's minimum cacheable size); callers then send the full prompt.
+    """
+    if settings.gemini_context_cache_ttl_seconds <= 0:
+        return None
+
+    owner = (key_token, settings.gemini_model)
+    entry = _context_cache.get(file_uri)
+    if entry is not None and entry[:2] == owner:
+        return entry[2]
+    if _context_cache_failures.get(file_uri):
+        return None
+
+    with _context_cache_locks_guard:
+        lock = _context_cache_locks.setdefault(file_uri, threading.Lock())
+    with lock:
+        # Another segment of the same document may have created it meanwhile
+        entry = _context_cache.get(file_uri)
+        if entry is not None and entry[:2] == owner:
+            return entry[2]
+        if _context_cache_failures.get(file_uri):
+            return None
+
+        name = _create_context_cache(client, file_uri, mime_type)
+        if name is None:
+            _context_cache_failures.set(file_uri, True)
+        else:
+            _context_cache.set(file_uri, (*owner, name))
+        return name
+
+
+def _create_context_cache(client: genai.Client, file_uri: str, mime_type: str) -> str | None:
+    """Create a context cache holding the file and BLUEPRINT_PROMPT; None on failure."""
+    from google.genai import types
+
+    try:
+        cache = client.caches.create(
+            model=settings.gemini_model,
+            config=types.CreateCachedContentConfig(
+                contents=[
+                    {
+                        "role": "user",
+                        "parts": [
+                            {"file_data": {"mime_type": mime_type, "file_uri": file_uri}},
+                            {"text": BLUEPRINT_PROMPT},
+                        ],
+                    }
+                ],
+                ttl=f"{settings.gemini_context_cache_ttl_seconds}s",
+            ),
+        )
+    except Exception as exc:
+        logger.warning(
+            "Gemini context cache unavailable, sending full prompts: file_uri=%s, error=%s: %s",
+            file_uri,
+            type(exc).__name__,
+            exc,
+        )
+        return None
+
+    logger.info("Gemini context cache created: file_uri=%s, cache=%s", file_uri, cache.name)
+    return cache.name
+
+
+def release_context_cache(file_uri: str) -> None:
+    """
+    Delete the context cache for an uploaded file, if one was created.
+
+    Called once a run's segments are done so the cache isn't billed until its TTL.
+    Failures are logged, not raised; the cache then expires on its own.
+    """
+    with _context_cache_locks_guard:
+        _context_cache_locks.pop(file_uri, None)
+    entry = _context_cache.get(file_uri)
+    _context_cache.pop(file_uri)
+    _context_cache_failures.pop(file_uri)
+    if entry is None:
+        return
+
+    name = entry[2]
+    try:
+        # A cache created under a since-rotated key can't be deleted with the new one;
+        # it expires on its own
+        get_gemini_client().caches.delete(name=name)
+    except Exception as exc:
+        logger.warning(
+            "Gemini context cache delete failed: file_uri=%s, cache=%s, error=%s: %s",
+            file_uri,
+            name,
+            type(exc).__name__,
+            exc,
+        )
+        return
+    logger.info("Gemini context cache deleted: file_uri=%s, cache=%s", file_uri, name)
 
 
 def upload_file(file_bytes: bytes, filename: str) -> Tuple[str, str, Dict[str, Any]]:
@@ -83,19 +278,20 @@ def upload_file(file_bytes: bytes, filename: str) -> Tuple[str, str, Dict[str, A
     """
     start_time = time.time()
     file_size_kb = len(file_bytes) / 1024
-    logger.info(f"Uploading file to Gemini: filename={filename}, size={file_size_kb:.2f}KB")
+    logger.info("Uploading file to Gemini: filename=%s, size=%.2fKB", filename, file_size_kb)
 
     client = get_gemini_client()
 
-    # The google-genai client expects a file path; write to a temp file.
+    # Upload straight from memory; a file object carries no extension, so the
+    # MIME type is given explicitly.
     # Caller is responsible for managing where bytes come from (FastAPI UploadFile, etc.).
-    from tempfile import NamedTemporaryFile
+    from google.genai import types
 
     try:
-        with NamedTemporaryFile(suffix=".pdf") as tmp:
-            tmp.write(file_bytes)
-            tmp.flush()
-            uploaded = client.files.upload(file=tmp.name)
+        uploaded = client.files.upload(
+            file=io.BytesIO(file_bytes),
+            config=types.UploadFileConfig(mime_type="application/pdf", display_name=filename),
+        )
 
         duration = time.time() - start_time
         file_uri = uploaded.uri
@@ -105,22 +301,74 @@ def upload_file(file_bytes: bytes, filename: str) -> Tuple[str, str, Dict[str, A
             "size_bytes": getattr(uploaded, "size_bytes", None),
         }
         logger.info(
-            f"File upload completed: filename={filename}, file_uri={file_uri}, "
-            f"duration={duration:.2f}s, size_bytes={metadata.get('size_bytes')}"
+            "File upload completed: filename=%s, file_uri=%s, duration=%.2fs, size_bytes=%s",
+            filename,
+            file_uri,
+            duration,
+            metadata.get("size_bytes"),
         )
         return file_uri, mime_type, metadata
     except Exception as exc:
         duration = time.time() - start_time
         logger.error(
-            f"File upload error: filename={filename}, duration={duration:.2f}s, "
-            f"error={type(exc).__name__}: {str(exc)}",
+            "File upload error: filename=%s, duration=%.2fs, error=%s: %s",
+            filename,
+            duration,
+            type(exc).__name__,
+            exc,
             exc_info=True,
         )
         raise
 
 
+def _strip_code_fence(text: str) -> str:
+    """
+    Remove a surrounding markdown code fence (```json ... ``` or ``` ... ```) and whitespace.
+
+    Either fence may be missing (e.g. a truncated response keeps only the opening one).
+    Plain prefix/suffix checks only touch the ends of the text, unlike a regex over
+    the whole (often 100KB+) response.
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        text = text[7:] if text.startswith("```json") else text[3:]
+    return text.removesuffix("```").strip()
+
+
+def valid_list_items(items: list) -> Tuple[list, str | None]:
+    """
+    Return (items matching VOTER_ITEM_SCHEMA, first validation error or None).
+
+    Applied when a segment's list is parsed for storage and merging; the raw response
+    keeps every row as Gemini returned it.
+    """
+    valid = []
+    first_error = None
+    for item in items:
+        try:
+            _validate_list_item(item)
+        except fastjsonschema.JsonSchemaValueException as exc:
+            first_error = first_error or exc.message
+            continue
+        valid.append(item)
+    return valid, first_error
+
+
 def _build_segment_instruction(
     segment_type: str, page_start: int, page_end: int, sections: list | None = None
+) -> str:
+    # Sections are reduced to the hashable fields the instruction uses, so repeated
+    # segments (retries, re-runs, chunks sharing a document's sections) hit the cache
+    section_key = tuple(
+        (sec.section_id, sec.section_name_english or sec.section_name_local or "")
+        for sec in sections or ()
+    )
+    return _build_segment_instruction_cached(segment_type, page_start, page_end, section_key)
+
+
+@lru_cache(maxsize=1024)
+def _build_segment_instruction_cached(
+    segment_type: str, page_start: int, page_end: int, section_key: tuple[tuple[int | None, str], ...]
 ) -> str:
     if segment_type == "HEADER":
         return f"Process page {page_start} only for header information."
@@ -131,11 +379,11 @@ def _build_segment_instruction(
     )
     
     # Add section detection instructions for LIST_CHUNK segments
-    if sections:
+    if section_key:
         section_list = ", ".join([
-            f"Section {sec.section_id}: {sec.section_name_english or sec.section_name_local or ''}"
-            for sec in sections
-            if sec.section_id is not None
+            f"Section {section_id}: {section_name}"
+            for section_id, section_name in section_key
+            if section_id is not None
         ])
         instruction += (
             f"\n\nSECTION DETECTION:\n"
@@ -159,6 +407,7 @@ def extract_segment(
     page_start: int,
     page_end: int,
     sections: list | None = None,
+    use_context_cache: bool = True,
 ) -> Dict[str, Any]:
     """
     Call Gemini for a single segment and return parsed JSON (header + list).
@@ -172,40 +421,56 @@ def extract_segment(
         page_start: Starting page number
         page_end: Ending page number
         sections: Optional list of DocumentSection objects from database for LIST_CHUNK segments
+        use_context_cache: Reuse (or create) the file's context cache; see release_context_cache
     """
     start_time = time.time()
-    client = get_gemini_client()
+    key_token, client = _resolve_gemini_client()
 
     segment_instruction = _build_segment_instruction(
         segment_type=segment_type, page_start=page_start, page_end=page_end, sections=sections
     )
-    prompt = f"{BLUEPRINT_PROMPT}\n\nSEGMENT INSTRUCTION:\n{segment_instruction}"
+    cached_content = (
+        _get_context_cache(client, key_token, file_uri, mime_type) if use_context_cache else None
+    )
 
     logger.info(
-        f"Gemini call starting: segment_type={segment_type}, pages={page_start}-{page_end}, "
-        f"model={settings.gemini_model}"
+        "Gemini call starting: segment_type=%s, pages=%s-%s, model=%s",
+        segment_type,
+        page_start,
+        page_end,
+        settings.gemini_model,
     )
 
     try:
         from google.genai import types
-                
-        response = client.models.generate_content(
-            model=settings.gemini_model,
-            contents=[
-                {
-                    "role": "user",
-                    "parts": [
-                        {
-                            "file_data": {
-                                "mime_type": mime_type,
-                                "file_uri": file_uri,
-                            }
-                        },
-                        {"text": prompt},
-                    ],
-                }
-            ],
-        )
+
+        if cached_content:
+            # File and blueprint come from the context cache
+            response = client.models.generate_content(
+                model=settings.gemini_model,
+                contents=[
+                    {"role": "user", "parts": [{"text": _SEGMENT_HEADING + segment_instruction}]}
+                ],
+                config=types.GenerateContentConfig(cached_content=cached_content),
+            )
+        else:
+            response = client.models.generate_content(
+                model=settings.gemini_model,
+                contents=[
+                    {
+                        "role": "user",
+                        "parts": [
+                            {
+                                "file_data": {
+                                    "mime_type": mime_type,
+                                    "file_uri": file_uri,
+                                }
+                            },
+                            {"text": _PROMPT_PREFIX + segment_instruction},
+                        ],
+                    }
+                ],
+            )
 
         duration = time.time() - start_time
 
@@ -239,74 +504,107 @@ def extract_segment(
                     if hasattr(candidate, "safety_ratings"):
                         error_details["safety_ratings"] = str(candidate.safety_ratings)
                 
+                # A fixed set of attributes rather than dir(response), which formats
+                # every SDK attribute on each empty response
+                response_attrs = {
+                    attr: getattr(response, attr, None) for attr in _EMPTY_RESPONSE_ATTRS
+                }
                 logger.error(
-                    f"Gemini call failed: segment_type={segment_type}, pages={page_start}-{page_end}, "
-                    f"duration={duration:.2f}s, error=Empty response, details={error_details}, "
-                    f"response_type={type(response)}, response_attrs={dir(response)}"
+                    "Gemini call failed: segment_type=%s, pages=%s-%s, "
+                    "duration=%.2fs, error=Empty response, details=%s, "
+                    "response_type=%s, response_attrs=%s",
+                    segment_type,
+                    page_start,
+                    page_end,
+                    duration,
+                    error_details,
+                    type(response),
+                    response_attrs,
                 )
                 raise RuntimeError(f"Empty response from Gemini for extract_segment. Details: {error_details}")
 
         # Clean the text - remove markdown code blocks if present
-        text = text.strip()
-        if text.startswith("```json"):
-            text = text[7:]  # Remove ```json
-        elif text.startswith("```"):
-            text = text[3:]  # Remove ```
-        if text.endswith("```"):
-            text = text[:-3]  # Remove closing ```
-        text = text.strip()
+        text = _strip_code_fence(text)
 
         if not text:
             logger.error(
-                f"Gemini call failed: segment_type={segment_type}, pages={page_start}-{page_end}, "
-                f"duration={duration:.2f}s, error=Empty text after cleaning"
+                "Gemini call failed: segment_type=%s, pages=%s-%s, "
+                "duration=%.2fs, error=Empty text after cleaning",
+                segment_type,
+                page_start,
+                page_end,
+                duration,
             )
             raise RuntimeError("Empty text after cleaning response from Gemini.")
 
         # Check if response might be truncated (doesn't end with closing brace)
         if not text.rstrip().endswith('}'):
             logger.warning(
-                f"Gemini response may be truncated: segment_type={segment_type}, pages={page_start}-{page_end}, "
-                f"response_ends_with={repr(text[-100:])}"
+                "Gemini response may be truncated: segment_type=%s, pages=%s-%s, "
+                "response_ends_with=%r",
+                segment_type,
+                page_start,
+                page_end,
+                text[-100:],
             )
         
         # Response must be exactly the JSON object according to the blueprint schema.
         try:
-            parsed = json.loads(text)
-        except json.JSONDecodeError as e:
+            parsed = orjson.loads(text)
+        except orjson.JSONDecodeError as e:
             # Log the actual response text (truncated) for debugging
             preview = text[:500] if len(text) > 500 else text
             logger.error(
-                f"Gemini call JSON decode error: segment_type={segment_type}, pages={page_start}-{page_end}, "
-                f"duration={duration:.2f}s, error={type(e).__name__}: {str(e)}, "
-                f"response_preview={repr(preview)}"
+                "Gemini call JSON decode error: segment_type=%s, pages=%s-%s, "
+                "duration=%.2fs, error=%s: %s, response_preview=%r",
+                segment_type,
+                page_start,
+                page_end,
+                duration,
+                type(e).__name__,
+                e,
+                preview,
             )
             raise RuntimeError(
                 f"Failed to parse JSON response from Gemini: {str(e)}. "
                 f"Response preview: {repr(preview)}"
             ) from e
 
-        # Truncate response for logging (first 200 chars of JSON string)
-        response_preview = json.dumps(parsed)[:200]
-        logger.info(
-            f"Gemini call completed: segment_type={segment_type}, pages={page_start}-{page_end}, "
-            f"duration={duration:.2f}s, response_preview={response_preview}..."
-        )
+        if logger.isEnabledFor(logging.INFO):
+            # Truncate response for logging (first 200 chars of JSON string)
+            # Byte slice may split a multi-byte character; drop the partial tail
+            response_preview = orjson.dumps(parsed)[:200].decode("utf-8", "ignore")
+            logger.info(
+                "Gemini call completed: segment_type=%s, pages=%s-%s, "
+                "duration=%.2fs, response_preview=%s...",
+                segment_type,
+                page_start,
+                page_end,
+                duration,
+                response_preview,
+            )
 
         # Log counts for metrics
         header_present = bool(parsed.get("header"))
         list_count = len(parsed.get("list", [])) if isinstance(parsed.get("list"), list) else 0
         logger.info(
-            f"Gemini response summary: segment_type={segment_type}, has_header={header_present}, "
-            f"list_items={list_count}"
+            "Gemini response summary: segment_type=%s, has_header=%s, list_items=%s",
+            segment_type,
+            header_present,
+            list_count,
         )
 
         return parsed
     except Exception as exc:
         duration = time.time() - start_time
         logger.error(
-            f"Gemini call error: segment_type={segment_type}, pages={page_start}-{page_end}, "
-            f"duration={duration:.2f}s, error={type(exc).__name__}: {str(exc)}",
+            "Gemini call error: segment_type=%s, pages=%s-%s, duration=%.2fs, error=%s: %s",
+            segment_type,
+            page_start,
+            page_end,
+            duration,
+            type(exc).__name__,
+            exc,
             exc_info=True,
         )
         raise